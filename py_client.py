@@ -6,20 +6,24 @@ from __future__ import annotations
 # profiler.start()
 
 
-import pygame, os, time, asyncio, websockets, queue, threading, json, sys, subprocess
+import pygame, os, time, asyncio, websockets, queue, threading, json, sys, subprocess, urllib.request, urllib.error, argparse
 
 import py_sprites
 
 from py_stager import Stager
-from py_config import config
 from py_resource import resource_path
-from py_input import inputManager
-from py_ui_sprites import render_text
-from py_soundmixer import soundMixer
+from py_ui_sprites import IncrementalText, fontAtlas
+from py_simulation import PADDLE_X, new_simulation
+from py_netcode import RollbackSession, InputBatcher, unpack_inputs, INPUT_SEND_HZ
+from py_replay import ClientReplayWriter, ClientReplay
+from py_world import World, default_world
+from py_render import loadSprite, surfaceCache, window_to_screen, DirtyRectRenderer, StaticLayer, STATIC_LAYER_TEAMS, render_list
+from py_input import PressedKeys, InputScript
+from py_soundmixer import SoundMixer
+from py_netstats import NetStats, message_type, NETSTATS_DUMP_S
 
 from socket import gethostname
 from hashlib import sha256
-from random import randint, choice
 
 # :: FPS SPEEDS BEFORE, basis 60fps unlocked ::
 # 120% Jona's gaming laptop
@@ -40,6 +44,14 @@ os.environ['SDL_VIDEO_CENTERED'] = '1'
 # BLACKLIST = {"__internal_mouse__", "__debug__"}
 BLACKLIST = {"__internal_mouse__"}
 
+# Fixed timestep: at most this many ticks to catch up per drawn frame, and the most real time
+# one frame may account for (a dragged window or a breakpoint shouldn't fast-forward the game)
+SIM_MAX_CATCHUP_TICKS = 5
+SIM_MAX_FRAME_S = 0.25
+
+# Every key code pygame knows, probed each tick while recording a replay
+REPLAY_KEYS = sorted({getattr(pygame, name) for name in dir(pygame) if name.startswith("K_")})
+
 
 def running_as_exe():
     # Nuitka sets __compiled__ = True
@@ -90,7 +102,10 @@ def set_always_on_top():
 
 class ClientGame:
 
-    def __init__(self):
+    def __init__(self, world: World | None = None):
+        # config, rng, input and audio; the default world is the usual singletons
+        self.world = world if world is not None else default_world
+
         self.uri = "wss://pypongonline.onrender.com/ws"
         # self.uri = "ws://localhost:8000/ws" # local testing, comment out for production
     
@@ -116,18 +131,24 @@ class ClientGame:
         self.desktop_res_x, self.desktop_res_y = display_info.current_w, display_info.current_h
 
 
-        self.screen = pygame.display.set_mode(
-            (config.res_x, config.res_y),
-            pygame.DOUBLEBUF | pygame.HWSURFACE
-        )
+        # self.display is the window, self.screen is what everything draws to (the same surface,
+        # unless config.native_render, see openWindow / presentFrame)
+        self.display = self.screen = None
+        # only repaint / push to the window what changed since the last frame (None = full redraw + flip)
+        self.renderer = DirtyRectRenderer()
+        # goals / decor drawn once onto a background, see drawFrame
+        self.static_layer = StaticLayer()
+        self.render_dirty_rects = True
+        self.dirty_rects = None
+        self.openWindow(pygame.DOUBLEBUF | pygame.HWSURFACE)
 
         self.clock = pygame.time.Clock()
-        self.window_current_scale = config.resolution_scale
-        self.window_best_scale = config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
+        self.window_current_scale = self.world.config.window_scale
+        self.window_best_scale = self.world.config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
 
 
         # Set stage
-        self.stager = Stager(self.screen,self.entities)
+        self.stager = Stager(self.screen,self.entities,self.world)
 
         # --- user unique id ---
         self.client_id_hash = sha256(gethostname().encode()).hexdigest()
@@ -149,6 +170,9 @@ class ClientGame:
         self.main_loop_fps_tracking = 0
         self.main_loop_fps = 0
         self.__fps_impact = 0
+        # Fixed timestep (see runFixedTimestep): real time not yet simulated
+        self.sim_accumulator = 0.0
+        self.sim_last_time = 0.0
 
         # Caching
         self.__cache_frame__ = -1
@@ -158,6 +182,9 @@ class ClientGame:
         self._entity_membership_sets = {k: set() for k in self.entities.keys()}
         self.__client_ui_cached_text = ""
         self.__debug_ui_cached_text = ""
+        # ...and what is on screen for each, updated row by row / cell by cell
+        self.ui_text = IncrementalText()
+        self.debug_text = IncrementalText()
 
 
         # Main Menu
@@ -208,13 +235,25 @@ class ClientGame:
         self.playOFF_drawn_lines = 0
         self.playOFF_began = False
 
-        # Game tracking
+        # Game tracking (sprites share this rng, see py_sprites.Sprite.rng)
+        self.rng = self.world.rng
         self.game_scores = [0,0,0,0] # for now, 4 players is enough :3
         self._game_client_username = "LUKIE"
         self.game_player_names = [self._game_client_username,"WAYNE","JONAH","BOZZY"]
         self.game_halt_for_x_ticks = 0
         self.game_goal_scored = False
 
+        # Replays (offline games only), enabled from the command line
+        self.replay_record_path = None
+        self.replay_writer: ClientReplayWriter | None = None
+        self.replay_playback: ClientReplay | None = None
+
+        # Headless runs (--headless): no window on top, no frame cap, stop after headless_frames
+        self.headless = False
+        self.headless_frames = 0
+        self.headless_script: InputScript | None = None
+        self.headless_frame_times: list[float] = []
+
         # Networking
         self.net_connected = False
         self.net_wasConnected = False
@@ -232,17 +271,42 @@ class ClientGame:
         self.net_last_epoch_attempt = 0
         self.net_is_rate_limited = False
         self.net_is_rate_limited_prev = False
+        # Plain HTTP peek at GET /lobbies (no socket needed), used while cold booting
+        self.net_http_thread = None
+        self.net_http_status = None
+        self.net_http_etag = None
+        self.net_http_poll_s = 5
+        self.net_http_last_poll = 0
+        # Message / byte counters for the socket (debug overlay), appended to net_stats_path if set (--netstats)
+        self.net_stats = NetStats()
+        self.net_stats_path = None
 
         # Online
         self.online_tick = 0
         self.online_connect_tick = 0
         self.online_waiting_tick = 0
         self.online_offline_tick = 0
+        self.online_game_tick = 0
+        self.online_slot = 0 # which paddle we control (0 left, 1 right)
+        self.online_spectating = False
+        self.online_room_name = None
+        self.online_room_state = None # latest room_state snapshot from the server
+        self.online_input_dir = 0
+        self.online_start = {} # the start_game message (netcode, seed, ...)
+        self.online_rollback: RollbackSession | None = None
+        self.online_inputs: InputBatcher | None = None
+        self.net_input_send_hz = INPUT_SEND_HZ # packets/s, independent of the frame rate (--input-hz)
+        self.net_netcode = "snapshot" # netcode we ask for when hosting ("rollback" via --rollback)
 
         # Lobby
-        self.lobbies = []
+        self.lobbies = [] # only the page currently fetched from the server
         self.lobby_browser_tick = 0
-        self.lobby_index = 0
+        self.lobby_index = 0 # absolute index, across all pages
+        self.lobby_page_offset = 0
+        self.lobby_page_size = 8
+        self.lobby_total = 0
+        self.lobby_filter_free = False
+        self.lobby_filter_prefix = ""
         self.lobby_input_epoch = 0
         self.lobby_id, self.lobby_name = None, None
 
@@ -316,22 +380,31 @@ class ClientGame:
                 print(f"websocket_loop : DEBUG : connected to server")
 
                 await ws.send("Hello from client")
+                self.net_stats.record("out", "other", len("Hello from client"))
+                last_dump = time.time()
 
                 while True:
                     # Send queued outbound messages
                     try:
                         msg = self.net_out.get_nowait()
                         await ws.send(msg)
+                        self.net_stats.record("out", message_type(msg), len(msg))
                     except queue.Empty:
                         pass
 
                     # Receive inbound messages (non-blocking)
                     try:
                         incoming = await asyncio.wait_for(ws.recv(), timeout=0.05)
+                        self.net_stats.record("in", message_type(incoming), len(incoming))
                         self.net_in.put(incoming)
                     except asyncio.TimeoutError:
                         pass
 
+                    # this thread is the one allowed to block, so the dump lives here
+                    if self.net_stats_path and time.time() - last_dump >= NETSTATS_DUMP_S:
+                        last_dump = time.time()
+                        self.net_stats.dump(self.net_stats_path)
+
         except Exception as e:
             # Capture error for main thread to interpret
             self.net_last_error = str(e).lower()
@@ -340,6 +413,8 @@ class ClientGame:
         finally:
             # Socket is definitively closed here
             self.net_connected = False
+            if self.net_stats_path and self.net_wasConnected:
+                self.net_stats.dump(self.net_stats_path)
             self.clear_network_queues()
             self.network_thread = None
 
@@ -370,6 +445,38 @@ class ClientGame:
             and any(err in self.net_last_error for err in ( "remote computer refused", "getaddrinfo failed", "http 404", "http 403"))
         )
 
+    def lobby_status_url(self):
+        # wss://host/ws -> https://host/lobbies
+        base = self.uri.replace("wss://", "https://", 1).replace("ws://", "http://", 1)
+        return base.rsplit("/ws", 1)[0] + "/lobbies"
+
+    def poll_server_status(self):
+        """
+        Fire a single GET /lobbies on a daemon thread. Sends the last ETag back,
+        so an unchanged lobby list only costs a 304 with no body.
+        """
+        if self.net_http_thread and self.net_http_thread.is_alive():
+            return
+
+        def _worker():
+            request = urllib.request.Request(self.lobby_status_url())
+            if self.net_http_etag:
+                request.add_header("If-None-Match", self.net_http_etag)
+
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    self.net_http_status = json.loads(response.read())
+                    self.net_http_etag = response.headers.get("ETag")
+            except urllib.error.HTTPError as e:
+                # 304 Not Modified: keep what we already have
+                if e.code != 304:
+                    print(f"poll_server_status : DEBUG : http error : {e.code}")
+            except Exception as e:
+                print(f"poll_server_status : DEBUG : server not reachable yet : {e}")
+
+        self.net_http_thread = threading.Thread(target=_worker, daemon=True)
+        self.net_http_thread.start()
+
     def clear_network_queues(self):
         while not self.net_in.empty():
             self.net_in.get_nowait()
@@ -388,6 +495,8 @@ class ClientGame:
         self.lobby_id = None
         self.lobby_name = None
         self.lobby_index = 0
+        self.lobby_page_offset = 0
+        self.lobby_total = 0
 
         # switch mode
         self.newMode("online-connect-init") # -> self.updateOnlineConnect
@@ -418,13 +527,13 @@ class ClientGame:
         self.newMode("menu")
         self.entitiesAllDelete()
         self._invalidate_ui_caches()
-        soundMixer.stop("ponggame")
-        soundMixer.play("ponggame", "audio/pongmenu.opus", vol_mult=self._game_settings_volume_multiplier*.1, loops=-1)
+        self.world.audio.stop("ponggame")
+        self.world.audio.play("ponggame", "audio/pongmenu.opus", vol_mult=self._game_settings_volume_multiplier*.1, loops=-1)
 
 
     def updateMainMenu(self):
         self.main_menu_tick += 1
-        keys = pygame.key.get_pressed()
+        keys = self.world.input.get_pressed()
         now = time.time()
 
         entities_demo = self.entities["demo"]
@@ -437,17 +546,18 @@ class ClientGame:
             self.entities["demo"].clear()
 
             # Generate demo sprites
-            entities_demo.append(py_sprites.CPUPlayer().summon(target_row=8, target_col=config.MAX_COL-2,initial_sprite_index=2,screen=self.screen))
+            entities_demo.append(py_sprites.CPUPlayer().summon(target_row=8, target_col=self.world.config.MAX_COL-2,initial_sprite_index=2,screen=self.screen))
             entities_demo.append(py_sprites.CPUPlayer().summon(target_row=8, target_col=2,initial_sprite_index=0,screen=self.screen))
 
-            entities_demo.append(py_sprites.Ball().summon(target_row=8, target_col=config.MAX_COL//2, screen=self.screen))
+            entities_demo.append(py_sprites.Ball().summon(target_row=8, target_col=self.world.config.MAX_COL//2, screen=self.screen))
             
             # Volume icon
             self.main_menu_speaker = py_sprites.Speaker()
-            entities_demo.append(self.main_menu_speaker.summon(target_row=config.MAX_ROW-3, target_col=2, screen=self.screen))
+            entities_demo.append(self.main_menu_speaker.summon(target_row=self.world.config.MAX_ROW-3, target_col=2, screen=self.screen))
 
-            # Logo icon
-            entities_demo.append(py_sprites.Logo().summon(target_row=1, target_col=8, screen=self.screen))
+            # Logo icon (decor, so it is baked into the static layer)
+            self.entities["decor"].clear()
+            self.entities["decor"].append(py_sprites.Logo().summon(target_row=1, target_col=8, screen=self.screen))
 
             # Sync speaker
             self.main_menu_speaker.sync_sprite_with_volume()
@@ -472,25 +582,25 @@ class ClientGame:
                         # Successful hit, but check owner to prevent multiple hit registrations
                         if not ball.owner or ball.owner != player:
                             print(f"updateMainMenu: {ball.owner} hit by {player}")
-                            soundMixer.play("bonk", f"audio/bonk{randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+                            self.world.audio.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
                             ball.owner = player
                             ball.set_velocity_basedOnPlayerMotion(player)
                 
                 # -- Ball v. Logo
                 # for logo in self.entitiesFilterOutByTeam(entities_demo,"decor"):
                 #     if isinstance(logo, py_sprites.Logo) and self.check_collision(ball.sprite_rect, logo.sprite_rect):
-                #         # soundMixer.play("bonk", f"audio/bonk{randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+                #         # soundMixer.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
                 #         # ball.set_velocity(ball.velocity_x, -ball.velocity_y)
-                #         # logo.set_sprite(0,0,(randint(150, 255), randint(150, 255), randint(150, 255)))
+                #         # logo.set_sprite(0,0,(self.rng.randint(150, 255), self.rng.randint(150, 255), self.rng.randint(150, 255)))
     
             # Check screen edge for ball redirect
             ball: py_sprites.Ball
             for ball in self.entitiesFilterOutByTeam(entities_demo,"balls"):
-                ball.redirect_if_on_edge(soundMixer=soundMixer,soundVolumeOverride=0)
+                ball.redirect_if_on_edge(soundMixer=self.world.audio,soundVolumeOverride=0)
                 if ball.query_isOffscreen() and ball.edge_collision_buffer_ignore > 0:
                     ball.respawn()
                     
-                    inverse = -1 if randint(0,1) == 0 else 1
+                    inverse = -1 if self.rng.randint(0,1) == 0 else 1
                     ball.set_velocity(velocity_x=1*inverse,velocity_y=1*inverse)
             
         # --- --- --- --- --- --- --- --- --- --- --- --- #
@@ -501,19 +611,19 @@ class ClientGame:
             # Check if we need to save settings or not.
             settingsChanged = False 
 
-            if inputManager.get_action("up", keys):
-                soundMixer.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            if self.world.input.get_action("up", keys):
+                self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
                 self.menu_index = (self.menu_index - 1) % len(self.menu_items)
                 self.menu_input_epoch = now
 
-            elif inputManager.get_action("down", keys):
-                soundMixer.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            elif self.world.input.get_action("down", keys):
+                self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
                 self.menu_index = (self.menu_index + 1) % len(self.menu_items)
                 self.menu_input_epoch = now
 
-            elif inputManager.get_action("select", keys):
+            elif self.world.input.get_action("select", keys):
                 self.menu_input_epoch = now
-                soundMixer.play("select", "audio/select.ogg",vol_mult=self._game_settings_volume_multiplier)
+                self.world.audio.play("select", "audio/select.ogg",vol_mult=self._game_settings_volume_multiplier)
                 action = self.menu_actions.get(self.menu_items[self.menu_index])
                 if action:
                     action()
@@ -523,11 +633,11 @@ class ClientGame:
                     return
             
             # Volume
-            elif inputManager.get_action("vol-down",keys):
-                soundMixer.play("bonk", f"audio/bonk{randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+            elif self.world.input.get_action("vol-down",keys):
+                self.world.audio.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
                 # Save new volume
                 new_sound_volume = round( max(0, self._game_settings_volume_multiplier - .1), 1)
-                config.redefine(volume=new_sound_volume)
+                self.world.config.redefine(volume=new_sound_volume)
                 self._game_settings_volume_multiplier = new_sound_volume
 
                 # sync
@@ -538,11 +648,11 @@ class ClientGame:
 
                 # flag the change
                 settingsChanged = True
-            elif inputManager.get_action("vol-up",keys):
-                soundMixer.play("bonk", f"audio/bonk{randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+            elif self.world.input.get_action("vol-up",keys):
+                self.world.audio.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
                 # Save new volume
                 new_sound_volume = round( min(1.0, self._game_settings_volume_multiplier + .1), 1)
-                config.redefine(volume=new_sound_volume)
+                self.world.config.redefine(volume=new_sound_volume)
                 self._game_settings_volume_multiplier = new_sound_volume
 
                 # sync
@@ -621,7 +731,7 @@ class ClientGame:
     def updatePregameCfgScreen(self):
         self.pregame_cfg_tick += 1
         now = time.time()
-        keys = pygame.key.get_pressed()
+        keys = self.world.input.get_pressed()
 
         # -- Should transition
         if self._pregame_cfg_trigger_transition:
@@ -632,7 +742,7 @@ class ClientGame:
         if self.pregame_cfg_tick == 1:
 
             # Create screen border
-            R, C = config.MAX_ROW, config.MAX_COL
+            R, C = self.world.config.MAX_ROW, self.world.config.MAX_COL
             deco, Cell = self.entities["decor"], py_sprites.Cell
             for c in range(C):
                 deco += [Cell().summon(target_col=c,target_row=0,screen=self.screen),
@@ -650,36 +760,36 @@ class ClientGame:
             row = self.pregame_row_index
 
             # now 6 rows total
-            if inputManager.get_action("up", keys):
+            if self.world.input.get_action("up", keys):
                 self.pregame_row_index = (row - 1) % 5; moved = True
-            elif inputManager.get_action("down", keys):
+            elif self.world.input.get_action("down", keys):
                 self.pregame_row_index = (row + 1) % 5; moved = True
 
-            elif inputManager.get_action("sel-left", keys) and row < 4:
+            elif self.world.input.get_action("sel-left", keys) and row < 4:
                 moved = True
                 if   row == 0: self.pregame_cfg_cpu_index = (self.pregame_cfg_cpu_index - 1) % len(self.pregame_cfg_cpu_difficulties)
                 elif row == 1: self.pregame_cfg_list_index = (self.pregame_cfg_list_index - 1) % len(self.pregame_cfg_gamemodes)
                 elif row == 2: self.pregame_time_seconds = max(30,  self.pregame_time_seconds - 30)
                 elif row == 3: self.pregame_cfg_goal_index = (self.pregame_cfg_goal_index - 1) % len(self.pregame_cfg_goal_values)
 
-            elif inputManager.get_action("sel-right", keys) and row < 4:
+            elif self.world.input.get_action("sel-right", keys) and row < 4:
                 moved = True
                 if   row == 0: self.pregame_cfg_cpu_index = (self.pregame_cfg_cpu_index + 1) % len(self.pregame_cfg_cpu_difficulties)
                 elif row == 1: self.pregame_cfg_list_index = (self.pregame_cfg_list_index + 1) % len(self.pregame_cfg_gamemodes)
                 elif row == 2: self.pregame_time_seconds = min(180, self.pregame_time_seconds + 30)
                 elif row == 3: self.pregame_cfg_goal_index = (self.pregame_cfg_goal_index + 1) % len(self.pregame_cfg_goal_values)
 
-            elif inputManager.get_action("select", keys) and row == 4:
+            elif self.world.input.get_action("select", keys) and row == 4:
                 self.menu_input_epoch = now + self.menu_input_cooldown
-                soundMixer.play("select", "audio/select.ogg", vol_mult=self._game_settings_volume_multiplier)
+                self.world.audio.play("select", "audio/select.ogg", vol_mult=self._game_settings_volume_multiplier)
                 self._pregame_cfg_trigger_transition = True
                 return
 
-            if inputManager.get_action("back", keys):
+            if self.world.input.get_action("back", keys):
                 self.newMode("menu-init")
 
             if moved:
-                soundMixer.play("scroll", "audio/scroll.ogg", vol_mult=self._game_settings_volume_multiplier)
+                self.world.audio.play("scroll", "audio/scroll.ogg", vol_mult=self._game_settings_volume_multiplier)
                 self.menu_input_epoch = now + self.menu_input_cooldown
 
                 # Apply to private settings
@@ -749,7 +859,7 @@ class ClientGame:
         # Spawn ball
         # print(self.online_connect_tick)
         if self.online_connect_tick % 60 == 0 and len(self.entities["balls"]) < 30:
-            self.entities["balls"].append(py_sprites.Ball().summon(target_row=randint(3,config.MAX_ROW), target_col=randint(3,config.MAX_COL), screen=self.screen))
+            self.entities["balls"].append(py_sprites.Ball().summon(target_row=self.rng.randint(3,self.world.config.MAX_ROW), target_col=self.rng.randint(3,self.world.config.MAX_COL), screen=self.screen))
 
         ball: py_sprites.Ball
         for ball in self.entities["balls"]:
@@ -761,19 +871,19 @@ class ClientGame:
                     velocity_y=vy if vy is not None else ball.velocity_y
                 )
                 ball.surface_tint_colour = (
-                    randint(50, 200),
-                    randint(50, 200),
-                    randint(50, 200)
+                    self.rng.randint(50, 200),
+                    self.rng.randint(50, 200),
+                    self.rng.randint(50, 200)
                 )
 
             if ball.edge_collision_buffer_ignore <= 0:
                 # Horizontal bounce
-                if ball.pos_x <= 0 or ball.pos_x + ball.sprite_rect.width >= config.res_x:
-                    bounce(vx=-ball.velocity_x, vy=choice([-1, 1]))
+                if ball.pos_x <= 0 or ball.pos_x + ball.sprite_rect.width >= self.world.config.res_x:
+                    bounce(vx=-ball.velocity_x, vy=self.rng.choice([-1, 1]))
 
                 # Vertical bounce
-                if ball.pos_y <= 0 or ball.pos_y + ball.sprite_rect.height >= config.res_y:
-                    bounce(vy=-ball.velocity_y, vx=choice([-1, 1]))
+                if ball.pos_y <= 0 or ball.pos_y + ball.sprite_rect.height >= self.world.config.res_y:
+                    bounce(vy=-ball.velocity_y, vx=self.rng.choice([-1, 1]))
 
             ball.ticker()
             ball.task()
@@ -789,13 +899,13 @@ class ClientGame:
 
         # # If the player is ALREADY CONNECTED online, redirect to lobby menu
         if self.net_connected:
-            soundMixer.play("connection_connected", "audio/connection_connected.ogg",vol_mult=self._game_settings_volume_multiplier)
-            self.net_out.put(json.dumps({"type": "list_lobbies"}))
+            self.world.audio.play("connection_connected", "audio/connection_connected.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.requestLobbyPage(0)
             self.newMode("lobby-browser") # -> self.updateLobbyBrowser
             return
 
         # Failsafe: eject to lost connection menu after timeout
-        if self.online_connect_tick >= config.frame_rate * self.net_timeout/2:
+        if self.online_connect_tick >= self.world.config.tick_rate * self.net_timeout/2:
             self.newMode("lost-init") # -> self.updateLost
             return
 
@@ -804,6 +914,10 @@ class ClientGame:
     #region OnlineWaiting
     def initOnlineWaiting(self):
         self.online_waiting_tick = 0
+        # the tag goes with the status, or the next poll's 304 would leave the status empty
+        self.net_http_status = None
+        self.net_http_etag = None
+        self.net_http_last_poll = 0
         self.newMode("online-waiting")
         self.entitiesAllDelete()
 
@@ -818,7 +932,7 @@ class ClientGame:
             self.net_connected_epoch = 0
             self.net_last_epoch_attempt = 0
 
-            self.net_out.put(json.dumps({"type": "list_lobbies"}))
+            self.requestLobbyPage(0)
             self.newMode("lobby-browser") # -> self.updateLobbyBrowser
             return
 
@@ -833,10 +947,20 @@ class ClientGame:
             # change the colour of the elapsed time to indicate sent attempt
             elapsed_net_out_colour = "~YELLOW" if elapsed % self.net_rendercom_retry_s == 0 else ""
 
+            # Peek at the lobby count over plain HTTP while the socket is still waiting
+            if time.time() - self.net_http_last_poll >= self.net_http_poll_s:
+                self.net_http_last_poll = time.time()
+                self.poll_server_status()
+
+            if self.net_http_status:
+                server_status = f"~GREENSERVER IS AWAKE!`{self.net_http_status['lobbies']} LOBBIES - {self.net_http_status['players']} PLAYERS"
+            else:
+                server_status = "~GREENYou're the only player online.`thanks for playing my game!"
+
             final_text = [
                  "``SERVER IS COLD BOOTING``"
                 f"``THIS MAY TAKE UP TO {self.net_rendercom_timeout} SECONDS.`BUT USUALLY TAKES 60`"
-                f"{elapsed_net_out_colour}({self.net_rendercom_timeout-elapsed})~#`{self.dots}```~GREENYou're the only player online.`thanks for playing my game!"
+                f"{elapsed_net_out_colour}({self.net_rendercom_timeout-elapsed})~#`{self.dots}```{server_status}"
             ]
             final_text = final_text[0]
 
@@ -860,11 +984,11 @@ class ClientGame:
     def updateOnlineOffline(self):
         self.online_offline_tick += 1
 
-        keys = pygame.key.get_pressed()
+        keys = self.world.input.get_pressed()
 
         self.__client_ui_cached_text = self._render_ui_gateway_solver("```~YELLOW(SERVER)`````PLEASE TRY AGAIN LATER````ESC BACK TO MENU``",self.__client_ui_cached_text)
 
-        if inputManager.get_action("back", keys):
+        if self.world.input.get_action("back", keys):
             self.newMode("menu-init")
 
     # ========================================================
@@ -878,7 +1002,7 @@ class ClientGame:
     def updateLobbyBrowser(self):
         self.lobby_browser_tick += 1
 
-        keys = pygame.key.get_pressed()
+        keys = self.world.input.get_pressed()
         now = time.time()
 
         # --- FETCH WEBSERVER DATA ---
@@ -896,7 +1020,7 @@ class ClientGame:
             self.net_is_rate_limited = ("rate_limited" in msg_type)
             if self.net_is_rate_limited_prev != self.net_is_rate_limited:
                 self.net_is_rate_limited_prev = self.net_is_rate_limited
-                soundMixer.play("connection_rl", "audio/connection_rl.ogg",vol_mult=self._game_settings_volume_multiplier)
+                self.world.audio.play("connection_rl", "audio/connection_rl.ogg",vol_mult=self._game_settings_volume_multiplier)
             print(f"updateLobbyBrowser: net_is_rate_limited: {self.net_is_rate_limited}")
 
             # --- Check for lobby assoicated things ---
@@ -906,6 +1030,9 @@ class ClientGame:
                 
                     case "lobby_list":
                         self.lobbies = msg.get("lobbies", [])
+                        self.lobby_page_offset = msg.get("offset", 0)
+                        self.lobby_total = msg.get("total", len(self.lobbies))
+                        self.lobby_index = max(0, min(self.lobby_index, self.lobby_total - 1))
 
                     case "lobby_status":
                         # set lobby info if joined
@@ -914,11 +1041,20 @@ class ClientGame:
                         self.lobby_name = msg.get("name")
 
                         if self.lobby_id and self.lobby_name:
-                            soundMixer.play("lobby_create", "audio/lobby_create.ogg",vol_mult=self._game_settings_volume_multiplier)
+                            self.world.audio.play("lobby_create", "audio/lobby_create.ogg",vol_mult=self._game_settings_volume_multiplier)
                         else:
-                            soundMixer.play("lobby_leave", "audio/lobby_leave.ogg",vol_mult=self._game_settings_volume_multiplier)
+                            self.world.audio.play("lobby_leave", "audio/lobby_leave.ogg",vol_mult=self._game_settings_volume_multiplier)
 
                     case "start_game":
+                        self.online_slot = msg.get("slot", 0)
+                        self.online_start = msg
+                        self.online_spectating = False
+                        self.online_room_name = self.lobby_name
+                        self.newMode("transON-init")
+
+                    case "spectate_start":
+                        self.online_spectating = True
+                        self.online_room_name = msg.get("name")
                         self.newMode("transON-init")
         
 
@@ -927,24 +1063,36 @@ class ClientGame:
         if is_cooling_down: return self.renderLobbyUI()
 
         is_in_a_lobby = self.lobby_id != None
-        wants_to_create_lobby = inputManager.get_action("create", keys)
-        wants_to_leave_lobby = inputManager.get_action("leave", keys)
-        wants_to_go_back = inputManager.get_action("back", keys)
+        wants_to_create_lobby = self.world.input.get_action("create", keys)
+        wants_to_leave_lobby = self.world.input.get_action("leave", keys)
+        wants_to_quick_match = self.world.input.get_action("quick", keys)
+        wants_to_go_back = self.world.input.get_action("back", keys)
 
         if wants_to_create_lobby and (not is_in_a_lobby):
             print(f"updateLobbyBrowser : creating lobby")
             self.net_out.put(json.dumps({
                 "type": "create_lobby",
-                "owner": self.client_id_hash
+                "owner": self.client_id_hash,
+                "netcode": self.net_netcode,
             }))
             self.lobby_input_epoch = now
         
+        if wants_to_quick_match and (not is_in_a_lobby):
+            # server picks the oldest waiting lobby (or hosts one) in a single round trip
+            print(f"updateLobbyBrowser : quick match")
+            self.net_out.put(json.dumps({
+                "type": "quick_match",
+                "owner": self.client_id_hash,
+                "netcode": self.net_netcode,
+            }))
+            self.lobby_input_epoch = now
+
         if wants_to_leave_lobby and (is_in_a_lobby):
             print(f"updateLobbyBrowser : leave lobby")
             self.net_out.put(json.dumps({"type": "leave_lobby"}))
             self.lobby_input_epoch = now
 
-        if inputManager.get_action("back", keys):
+        if self.world.input.get_action("back", keys):
             self.newMode("menu-init")
 
 
@@ -956,60 +1104,214 @@ class ClientGame:
         if is_in_a_lobby: return
 
         
-        wants_to_scrollUp = inputManager.get_action("up", keys)
-        wants_to_scrollDown = inputManager.get_action("down", keys)
-        wants_to_select = inputManager.get_action("select", keys)
+        wants_to_scrollUp = self.world.input.get_action("up", keys)
+        wants_to_scrollDown = self.world.input.get_action("down", keys)
+        wants_to_select = self.world.input.get_action("select", keys)
+
+        wants_to_filter = self.world.input.get_action("filter", keys)
 
         if wants_to_scrollUp:
-            soundMixer.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
             self.lobby_index = max(0, self.lobby_index - 1)
             self.lobby_input_epoch = now
 
         if wants_to_scrollDown:
-            soundMixer.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
-            self.lobby_index = min(len(self.lobbies) - 1, self.lobby_index + 1)
+            self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.lobby_index = max(0, min(self.lobby_total - 1, self.lobby_index + 1))
+            self.lobby_input_epoch = now
+
+        if wants_to_filter:
+            self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.lobby_filter_free = not self.lobby_filter_free
+            self.lobby_index = 0
+            self.requestLobbyPage(0)
             self.lobby_input_epoch = now
 
+        # Scrolled off the fetched page -> lazily fetch the page it landed on
+        page_index = self.lobby_index - self.lobby_page_offset
+        if (wants_to_scrollUp or wants_to_scrollDown) and not (0 <= page_index < len(self.lobbies)):
+            self.requestLobbyPage((self.lobby_index // self.lobby_page_size) * self.lobby_page_size)
+
         if wants_to_select:
-            soundMixer.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.world.audio.play("scroll", "audio/scroll.ogg",vol_mult=self._game_settings_volume_multiplier)
             if not self.lobby_id:
-                # Prevent an index in empty 'self.lobbies[]' crash
-                if len(self.lobbies) == 0:
+                # Prevent an index outside of the fetched page crash (page may still be in flight)
+                if not (0 <= page_index < len(self.lobbies)):
                     return
-                # Join a lobby
-                lobby_id = self.lobbies[self.lobby_index]["id"]
+                # Join a lobby, or watch it if the match is already running
+                lobby = self.lobbies[page_index]
                 self.net_out.put(json.dumps({
-                    "type": "join_lobby",
-                    "id": lobby_id
+                    "type": "spectate" if lobby.get("running") else "join_lobby",
+                    "id": lobby["id"]
                 }))
             self.lobby_input_epoch = now
 
         self.renderLobbyUI()
 
+    def requestLobbyPage(self, offset):
+        """Ask the server for one page of lobbies; later pushes reuse this query."""
+        query = {
+            "type": "list_lobbies",
+            "offset": offset,
+            "limit": self.lobby_page_size,
+            "free": self.lobby_filter_free,
+        }
+        if self.lobby_filter_prefix:
+            query["prefix"] = self.lobby_filter_prefix
+        self.net_out.put(json.dumps(query))
+
     # ========================================================
     # Online Game
     #region OnlineGame
     def initOnlineGame(self):
         self.transition_tick = 0
-
-        # Playing offline
-        self.playOFF_tick = 0
-        self.playOFF_countdown_epoch = 0
-        self.playOFF_draw_line = False
-        self.playOFF_drawn_lines = 0
-        self.playOFF_began = False
+        self.online_game_tick = 0
+        self.online_room_state = None
+        self.online_input_dir = 0
+        self.online_inputs = InputBatcher(send_hz=self.net_input_send_hz)
+
+        # Rollback: run the match ourselves, the server just relays inputs
+        self.online_rollback = None
+        start = self.online_start
+        if start.get("netcode") == "rollback" and not self.online_spectating:
+            sim = new_simulation(start.get("fixed_point", True), match_seconds=start["match_seconds"], seed=start["seed"])
+            self.online_rollback = RollbackSession(sim, self.online_slot)
 
         self.game_halt_for_x_ticks = 0
         self.game_goal_scored = False
         self.game_scores = [0,0,0,0]
         self.newMode("online-game")
 
+        self.world.audio.play("ponggame", f"audio/ponggame.mp3",vol_mult=self._game_settings_volume_multiplier*.1, loops=-1)
+
 
     def updateOnlineGame(self):
-        
-        # # testing ui
-        self.__client_ui_cached_text = self._render_ui_gateway_solver(f"~(return) testing",self.__client_ui_cached_text)
-        pass
+        #Type hints
+        ball: py_sprites.Ball
+        paddle: py_sprites.OnlinePlayer
+
+        self.online_game_tick += 1
+        keys = self.world.input.get_pressed()
+
+        # --- Setup on first frame: both paddles are server driven, we only send input ---
+        if self.online_game_tick == 1:
+            self.entities["players"] += [
+                py_sprites.OnlinePlayer().summon(target_row=0, target_col=0, initial_sprite_index=0, screen=self.screen),
+                py_sprites.OnlinePlayer().summon(target_row=0, target_col=0, initial_sprite_index=2, screen=self.screen),
+            ]
+            self.entities["balls"].append(py_sprites.Ball().summon(target_row=0, target_col=0, screen=self.screen))
+
+            for dash_row in range(self.world.config.RES_Y_INIT // 8):
+                self.entities["decor"].append(
+                    py_sprites.Dashline().summon(screen=self.screen, target_col=self.world.config.MAX_COL // 2, target_row=dash_row)
+                )
+            self._invalidate_entity_caches()
+
+        # --- Drain the server, only the newest snapshot matters ---
+        while not self.net_in.empty():
+            raw = self.net_in.get()
+            if not raw or raw[0] != "{":
+                continue
+
+            msg = json.loads(raw)
+            match msg.get("type"):
+                case "room_state":
+                    self.online_room_state = msg
+                    self._playOnlineEvents(msg.get("events", []))
+
+                case "peer_input":
+                    if self.online_rollback:
+                        for tick, direction in unpack_inputs(msg):
+                            self.online_rollback.add_remote_input(tick, direction)
+
+                case "game_over":
+                    print(f"updateOnlineGame : game over : {msg.get('reason')} {msg.get('scores')}")
+                    self.world.audio.play("gameEnd", f"audio/klaxon.ogg")
+                    self.leaveOnlineGame(notify_server=False)
+                    return
+
+        # --- Leave ---
+        if self.world.input.get_action("back", keys):
+            self.leaveOnlineGame()
+            return
+
+        # --- Send input (players only) ---
+        if not self.online_spectating:
+            direction = 0
+            if self.world.input.get_action("up", keys):
+                direction = -1
+            elif self.world.input.get_action("down", keys):
+                direction = 1
+
+            session = self.online_rollback
+            if session:
+                # every simulated tick's input is queued, with its tick as the seq
+                events = session.advance(direction)
+                if events is not None:
+                    self.online_inputs.push(direction, seq=session.sim.tick)
+                    self._playOnlineEvents(events)
+
+            elif direction != self.online_input_dir:
+                # snapshot: only changes
+                self.online_input_dir = direction
+                self.online_inputs.push(direction)
+
+            packet = self.online_inputs.poll(time.perf_counter())
+            if packet:
+                self.net_out.put(packet)
+
+        # --- Apply the latest snapshot (ours, when rolling back) ---
+        if self.online_rollback:
+            state = self.online_rollback.sim.snapshot()
+        else:
+            state = self.online_room_state
+        if state is None:
+            return
+
+        for paddle, paddle_x, paddle_y in zip(self.entities["players"], PADDLE_X, state["paddles"]):
+            paddle.set_native_position(paddle_x, paddle_y)
+
+        for ball in self.entities["balls"]:
+            ball.ticker()
+            ball.set_native_position(*state["ball"])
+            if ball.tick % 5 == 0:
+                ball.oscillate_sprite()
+
+        minutes, seconds = divmod(state["clock"], 60)
+        scores = state["scores"]
+        if self.online_spectating:
+            footer = f"~CYANSPECTATING {self.online_room_name}`({state['spectators']} WATCHING)~#"
+        else:
+            footer = f"(P{self.online_slot + 1}) YOU"
+
+        self.__client_ui_cached_text = self._render_ui_gateway_solver(
+            f"¬¬¬    ~YELLOW{minutes} {seconds}~#``````````````````¬¬¬   {scores[0]}   {scores[1]}``{footer}",
+            self.__client_ui_cached_text,
+            justification=None,
+        )
+
+    def _playOnlineEvents(self, events):
+        for event in events:
+            if event == "bonk":
+                self.world.audio.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+            elif event == "wall":
+                self.world.audio.play("initial_velocity", f"audio/initial_velocity.ogg",vol_mult=self._game_settings_volume_multiplier)
+            elif event == "goal":
+                self.world.audio.play("goal_client", "audio/scored_client.ogg",vol_mult=self._game_settings_volume_multiplier)
+
+    def leaveOnlineGame(self, notify_server=True):
+        if notify_server:
+            self.net_out.put(json.dumps({"type": "leave_spectate" if self.online_spectating else "leave_lobby"}))
+
+        # the server tears the lobby down with the room
+        self.lobby_id, self.lobby_name = None, None
+        self.online_spectating = False
+        self.online_room_state = None
+        self.online_rollback = None
+
+        self.world.audio.stop("ponggame")
+        self.newMode("lobby-browser-init")
+        self.requestLobbyPage(self.lobby_page_offset)
 
     
     # ========================================================
@@ -1036,6 +1338,16 @@ class ClientGame:
 
         self.game_ball_last_position = (0,0) # Currently using in the confetti spawning
 
+        # Every game gets a fresh seed; a replay reuses the recorded one, which (plus the same keys)
+        # reproduces the game exactly
+        if self.replay_playback:
+            self.pregame_time_seconds = self.replay_playback.match_seconds
+            self.rng.seed(self.replay_playback.seed)
+        else:
+            self.rng.seed()
+        if self.replay_record_path and not self.replay_playback:
+            self.replay_writer = ClientReplayWriter(self.rng.seed_value, self.pregame_time_seconds, self.world.config.tick_rate, self.world.config.resolution_scale)
+
         # Carried settings from pregame config
         minutes, seconds = divmod(self.pregame_time_seconds, 60)
         self.playOFF_clock = {"m": minutes, "s": seconds}
@@ -1044,7 +1356,7 @@ class ClientGame:
         
         self.newMode("offline-game")
 
-        soundMixer.stop("ponggame")
+        self.world.audio.stop("ponggame")
 
     
 
@@ -1059,7 +1371,7 @@ class ClientGame:
 
         # UPDATE LOGIC: 60FPS
         self.playOFF_tick += 1
-        keys = pygame.key.get_pressed()
+        keys = self.getReplayableKeys(self.playOFF_tick)
 
         # --- Setup on first frame ---
         if self.playOFF_tick == 1:
@@ -1077,14 +1389,14 @@ class ClientGame:
         # --- Halt frames ---
         if self.game_halt_for_x_ticks>0:
             self.game_halt_for_x_ticks-=1
-            soundMixer.pause("ponggame", pause_only=True)
+            self.world.audio.pause("ponggame", pause_only=True)
             return
         
-        soundMixer.pause("ponggame", unpause_only=True)
+        self.world.audio.pause("ponggame", unpause_only=True)
         
 
         # --- Solve time --- #
-        if (self.playOFF_tick % config.frame_rate == 0):
+        if (self.playOFF_tick % self.world.config.tick_rate == 0):
             under_sixty_secs = (self.playOFF_clock["s"]<=0)
             under_a_minute = (self.playOFF_clock["m"]<=0)
             if under_sixty_secs and not under_a_minute:
@@ -1097,7 +1409,7 @@ class ClientGame:
                 self.game_goal_scored = True # not really, but it works to trigger the end game sequence
                 self.game_halt_for_x_ticks = 180
 
-                soundMixer.play("gameEnd", f"audio/klaxon.ogg")
+                self.world.audio.play("gameEnd", f"audio/klaxon.ogg")
                 return
             
             else:
@@ -1111,7 +1423,8 @@ class ClientGame:
             # - END GAME?
             if (3 in self.game_scores) or self.playOFF_out_of_time:
                 self.game_verdict = "END"
-                soundMixer.stop("ponggame")
+                self.world.audio.stop("ponggame")
+                self.saveReplay()
                 self.newMode("menu-init")
 
             # - respawn balls
@@ -1136,9 +1449,9 @@ class ClientGame:
 
         # Draw one dash 12 times a second
         if self.playOFF_tick % 5 == 0 and self.playOFF_draw_line:
-            center_col = config.MAX_COL // 2
+            center_col = self.world.config.MAX_COL // 2
             # spawn a single dash at the next row
-            dash_row = self.playOFF_drawn_lines % (config.RES_Y_INIT // 8)
+            dash_row = self.playOFF_drawn_lines % (self.world.config.RES_Y_INIT // 8)
             self.entities["decor"].append(
                 py_sprites.Dashline().summon(
                     screen=self.screen,
@@ -1146,10 +1459,10 @@ class ClientGame:
                     target_row=dash_row
                 )
             )
-            soundMixer.play("line_draw", f"audio/linestep.wav",vol_mult=self._game_settings_volume_multiplier*.1)
+            self.world.audio.play("line_draw", f"audio/linestep.wav",vol_mult=self._game_settings_volume_multiplier*.1)
             if self.playOFF_drawn_lines >= 22:
                 self.playOFF_draw_line = False
-                soundMixer.play("ponggame", f"audio/ponggame.mp3",vol_mult=self._game_settings_volume_multiplier*.1, loops=-1)
+                self.world.audio.play("ponggame", f"audio/ponggame.mp3",vol_mult=self._game_settings_volume_multiplier*.1, loops=-1)
             
             self.playOFF_drawn_lines += 1
 
@@ -1162,7 +1475,7 @@ class ClientGame:
 
         if self.playOFF_began:
             self.playOFF_began = False
-            soundMixer.play("initial_velocity", f"audio/initial_velocity.ogg",vol_mult=self._game_settings_volume_multiplier)
+            self.world.audio.play("initial_velocity", f"audio/initial_velocity.ogg",vol_mult=self._game_settings_volume_multiplier)
 
         # Update the player
         for entity60 in self.entities["players"]:
@@ -1185,7 +1498,7 @@ class ClientGame:
                     # Successful hit, but check owner to prevent multiple hit registrations
                     if not ball.owner or ball.owner != player:
                         print(f"updateOfflineGame: {ball.owner} hit by {player}")
-                        soundMixer.play("bonk", f"audio/bonk{randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
+                        self.world.audio.play("bonk", f"audio/bonk{self.rng.randint(1,2)}.ogg",vol_mult=self._game_settings_volume_multiplier)
                         ball.owner = player
                         ball.set_velocity_basedOnPlayerMotion(player)
             
@@ -1218,11 +1531,11 @@ class ClientGame:
                     if "Left" in goal_name:
                         self.game_scores[2] += 1
                         # soundMixer.play("goal_opponent", "audio/scored_opponent.ogg",vol_mult=self._game_settings_volume_multiplier)
-                        soundMixer.play("goal_client", "audio/scored_client.ogg",vol_mult=self._game_settings_volume_multiplier)
+                        self.world.audio.play("goal_client", "audio/scored_client.ogg",vol_mult=self._game_settings_volume_multiplier)
                         ball.set_velocity(-1,0) # reset, set velocity toward Left player
                     elif "Right" in goal_name:
                         self.game_scores[0] += 1
-                        soundMixer.play("goal_client", "audio/scored_client.ogg",vol_mult=self._game_settings_volume_multiplier)
+                        self.world.audio.play("goal_client", "audio/scored_client.ogg",vol_mult=self._game_settings_volume_multiplier)
                         ball.set_velocity(1,0) # reset, set velocity toward Right player
 
                     # Check which goal belongs
@@ -1230,7 +1543,7 @@ class ClientGame:
         
         # Check screen edge for ball redirect
         for ball in self.entities["balls"]:
-            ball.redirect_if_on_edge(soundMixer=soundMixer)
+            ball.redirect_if_on_edge(soundMixer=self.world.audio)
 
         
         # -- debug, return ball back
@@ -1241,7 +1554,7 @@ class ClientGame:
                 ball.current_speed = ball.base_speed
                 ball.owner = None
                 ball.set_velocity(-1,0)
-                ball.move_position(dcol=config.MAX_COL // 3, drow=config.MAX_ROW // 2, set_position=True)
+                ball.move_position(dcol=self.world.config.MAX_COL // 3, drow=self.world.config.MAX_ROW // 2, set_position=True)
         
 
 
@@ -1250,13 +1563,103 @@ class ClientGame:
 
      
 
+    #region Replays
+    def getReplayableKeys(self, tick):
+        """pygame.key.get_pressed(), recorded or played back when a replay is active."""
+        if self.replay_playback:
+            return PressedKeys(self.replay_playback.keys_at(tick))
+
+        keys = self.world.input.get_pressed()
+        if self.replay_writer:
+            self.replay_writer.keys(tick, tuple(k for k in REPLAY_KEYS if keys[k]))
+        return keys
+
+    def saveReplay(self):
+        if not self.replay_writer:
+            return
+        self.replay_writer.end(self.playOFF_tick, [self.game_scores[0], self.game_scores[2]])
+        self.replay_writer.save(self.replay_record_path)
+        print(f"saveReplay : saved {self.replay_record_path}")
+        self.replay_writer = None
+
+    def runReplay(self, path):
+        """Re-run a recorded offline game headless, uncapped, and report how long it took."""
+        replay = self.replay_playback = ClientReplay(path)
+
+        # sprite maths depend on the scale, so match the recording
+        self.world.config.redefine(scale=replay.scale)
+        if replay.tick_rate != self.world.config.tick_rate:
+            print(f"runReplay : ⚠️  recorded at {replay.tick_rate:g} ticks/s, this build runs {self.world.config.tick_rate}, expect a DESYNC")
+        self.newMode("offline-game-init")
+
+        frames = 0
+        start = time.perf_counter()
+        with self.world.active():
+            while self.mode in ("offline-game-init", "offline-game") and self.playOFF_tick < replay.last_tick:
+                self.stepFrame()
+                frames += 1
+        elapsed = time.perf_counter() - start
+
+        scores = [self.game_scores[0], self.game_scores[2]]
+        print(f"runReplay : {frames} frames in {elapsed * 1000:.0f}ms ({frames / max(elapsed, 1e-9):.0f} fps) : scores {scores}")
+        if replay.end:
+            ok = (self.playOFF_tick, scores) == tuple(replay.end)
+            print(f"runReplay : recorded {replay.end[1]} at tick {replay.end[0]} : {'MATCH' if ok else 'DESYNC'}")
+            return 0 if ok else 1
+        return 0
+
+    def runHeadless(self, frames=None, script_path=None, mode=None):
+        """
+        Run the normal main loop with no frame cap for a fixed number of frames (or until the
+        end of an input script), then print timing stats. Used to benchmark render/update changes.
+        """
+        self.headless = True
+        if script_path:
+            self.headless_script = InputScript(script_path)
+        if frames is None:
+            frames = self.headless_script.last_frame + 1 if self.headless_script else 600
+        self.headless_frames = frames
+        if mode:
+            # straight into a match: the pregame screen is what loads its settings
+            if mode.startswith("offline-game"):
+                self.initPregameCfgScreen()
+            self.newMode(mode)
+
+        start = time.perf_counter()
+        self.mainloop()
+        elapsed = time.perf_counter() - start
+
+        times = sorted(self.headless_frame_times)
+        if not times:
+            print("runHeadless : no frames ran")
+            return 1
+
+        def percentile(p):
+            return times[min(len(times) - 1, int(len(times) * p))] * 1000
+
+        stats = {
+            "frames": len(times),
+            "seconds": round(elapsed, 3),
+            "fps": round(len(times) / max(elapsed, 1e-9), 1),
+            "frame_ms_mean": round(sum(times) / len(times) * 1000, 3),
+            "frame_ms_p50": round(percentile(0.50), 3),
+            "frame_ms_p95": round(percentile(0.95), 3),
+            "frame_ms_p99": round(percentile(0.99), 3),
+            "frame_ms_max": round(times[-1] * 1000, 3),
+            "mode": self.mode,
+        }
+        print(f"runHeadless : {stats['frames']} frames in {elapsed * 1000:.0f}ms ({stats['fps']:.0f} fps) : "
+              f"mean {stats['frame_ms_mean']:.2f}ms p95 {stats['frame_ms_p95']:.2f}ms max {stats['frame_ms_max']:.2f}ms")
+        print(json.dumps(stats))
+        return 0
+
     # ========================================================
     # Lost Connection
     #region LostConnection
 
     def initLostConnectionMenu(self):
         self.net_lost_tick = 0
-        soundMixer.play("connection_lost", "audio/connection_lost.ogg",vol_mult=self._game_settings_volume_multiplier)
+        self.world.audio.play("connection_lost", "audio/connection_lost.ogg",vol_mult=self._game_settings_volume_multiplier)
         self.newMode("lost")
         self.entitiesAllDelete()
         
@@ -1275,32 +1678,43 @@ class ClientGame:
     # Main Loop
     #region Mainloop
     def mainloop(self):
+        # every sprite made while running belongs to this game's world
+        with self.world.active():
+            self.world.input.start_controller_polling()
+            self._mainloop()
+
+    def _mainloop(self):
         running = True
 
         # NOW create the window
-        self.screen = pygame.display.set_mode((config.res_x, config.res_y))
+        self.openWindow()
 
         pygame.display.set_icon(
-            py_sprites.loadSprite([resource_path("sprites/cell.png")])
+            loadSprite([resource_path("sprites/cell.png")])
         )
         pygame.display.set_caption("PyPongOnline")
 
         # Hide mouse cursor
         pygame.mouse.set_visible(False)
 
-        set_always_on_top()
+        if not self.headless:
+            set_always_on_top()
 
         # load UI setting
         saveGameSettings = os.path.exists(gamesettings_filename)
-        if not saveGameSettings:
-            config.redefine(scale=config.calculate_best_fit_scale(self.desktop_res_x, self.desktop_res_y))
+        if not saveGameSettings and not self.headless:
+            self.world.config.redefine(scale=self.world.config.calculate_best_fit_scale(self.desktop_res_x, self.desktop_res_y))
             self.saveGameSettings()
 
         # Main loop
+        frame_start = self.sim_last_time = time.perf_counter()
         while running:
 
             time.sleep(self.__fps_impact)
 
+            if self.headless_script:
+                self.world.input.scripted_keys = self.headless_script.keys_at(self.main_loop_frame_count + 1)
+
             # DEBUG USE ONLY
             if self.debug:
                 # --- Calculate fps --- #
@@ -1312,19 +1726,19 @@ class ClientGame:
                     self.main_loop_fps_tracking = 0
                     self.main_loop_fps_last_epoch = now
 
-                keys = pygame.key.get_pressed()
+                keys = self.world.input.get_pressed()
 
                 if now >= self.debug_input_epoch:
 
-                    if inputManager.get_debug_action("toggle_whole_ui", keys):
+                    if self.world.input.get_debug_action("toggle_whole_ui", keys):
                         self.debug_whole_overlay = not self.debug_whole_overlay
-                    if inputManager.get_debug_action("toggle_overlay", keys):
+                    if self.world.input.get_debug_action("toggle_overlay", keys):
                         self.debug_overlay = not self.debug_overlay
-                    if inputManager.get_debug_action("unlock_fps", keys):
-                        redefine_task = config.redefine(framerate=9999) if config.frame_rate != 9999 else config.redefine(framerate=60)
-                    if inputManager.get_debug_action("custom_fps", keys):
-                        config.redefine(framerate=float(input("Enter custom fps (this field is not sanitised):")))
-                    if inputManager.get_debug_action("custom_fps_impact", keys):
+                    if self.world.input.get_debug_action("unlock_fps", keys):
+                        redefine_task = self.world.config.redefine(framerate=9999) if self.world.config.frame_rate != 9999 else self.world.config.redefine(framerate=60)
+                    if self.world.input.get_debug_action("custom_fps", keys):
+                        self.world.config.redefine(framerate=float(input("Enter custom fps (this field is not sanitised):")))
+                    if self.world.input.get_debug_action("custom_fps_impact", keys):
                         self.__fps_impact = float(input("Enter custom fps impact float (delay) (this field is not sanitised):"))
                 if any(keys) > 0:
                     self.debug_input_epoch = now+.3
@@ -1342,12 +1756,17 @@ class ClientGame:
                         fps_final_text = [f"~YELLOWFPS _ {self.main_loop_fps}"]
 
                     if self.debug_whole_overlay:
-                        fps_percent = (self.main_loop_fps / config.frame_rate) * 100
+                        fps_percent = (self.main_loop_fps / self.world.config.frame_rate) * 100
                         fps_final_text.append(
                             f"~YELLOWFPS _ {self.main_loop_fps} ({fps_percent:.0f}P) ({self.main_loop_frame_time}ms)`"
-                            f"FPS UNLOCKED _ {config.frame_rate != 60}`"
-                            f"VOL _ {config.volume_multiplier}`"
+                            f"FPS UNLOCKED _ {self.world.config.frame_rate != 60}`"
+                            f"VOL _ {self.world.config.volume_multiplier}`"
                             f"CONN _ {self.net_connected}`"
+                            f"SURF _ {surfaceCache.hits} HIT {surfaceCache.misses} MISS ({len(surfaceCache)})`"
+                            f"GLYPHS _ {self.ui_text.cells_redrawn + self.debug_text.cells_redrawn} REDRAWN`"
+                            f"DIRTY _ {self.renderer.last_rects} RECTS ({self.renderer.full_frames} FULL {self.renderer.partial_frames} PART)`"
+                            f"{self._debugNetText()}"
+                            f"{self._debugRollbackText()}"
 
                             f"BUILDVER _ {self.__BUILD_VER}`"
                         )
@@ -1356,27 +1775,19 @@ class ClientGame:
                     fps_final_text = fps_final_text[0]
                     if fps_final_text != self.__debug_ui_cached_text:
                         self.__debug_ui_cached_text = fps_final_text
-                        self.entities["__debug__"] = render_text(fps_final_text,justification="left")
+                        self.entities["__debug__"] = self.debug_text.render(fps_final_text,justification="left")
 
                 
                     
-            # Increment frame counter
-            self.main_loop_frame_count += 1
-
             # If rescale is detected, update the window
-            if self.window_current_scale != config.resolution_scale:
-                self.window_current_scale = config.resolution_scale
-                self.screen = pygame.display.set_mode((config.res_x, config.res_y))
+            if self.window_current_scale != self.world.config.window_scale:
+                self.window_current_scale = self.world.config.window_scale
+                self.openWindow()
                 self.main_menu_invoke_resolution_changed = True
                 self.entities["__internal_mouse__"].clear()
-                set_always_on_top() #reapplies to the new game window
+                if not self.headless:
+                    set_always_on_top() #reapplies to the new game window
             
-            # If 'mode' changed, update inputManager
-            if self.mode_old != self.mode:
-                inputManager.mode = self.mode
-                inputManager.debug = self.debug
-                self.mode_old = self.mode
-
             # Dev: halt the main loop
             if self.mainloop_halt_for_x_ticks > 0:
                 self.mainloop_halt_for_x_ticks -= 1
@@ -1391,20 +1802,25 @@ class ClientGame:
                 self.newMode("lost-init")
 
 
-            # Mode dispatch
-            self.update_methods.get(self.mode, lambda: print(f"mainloop : ⚠️  Warning: No update method implemented for self.mode: {self.mode}"))()
-
-            self.screen.fill((0, 0, 0))
-            for entity in self.entitiesAllReturn() + self.entities["__internal_mouse__"]:
-                entity.draw(self.screen)
-                if entity.mark_for_deletion:
-                    self.entities[entity.team].remove(entity)
+            if self.headless:
+                # benchmarks want the same work every frame: exactly one tick each
+                self.stepFrame()
+            else:
+                self.runFixedTimestep()
 
-            pygame.display.flip()
-            self.clock.tick(config.frame_rate)
+            self.presentFrame()
+            # headless runs uncapped (tick(0) only measures)
+            self.clock.tick(0 if self.headless else self.world.config.frame_rate)
             if self.main_loop_frame_count % 60 == 0:
                 self.main_loop_frame_time = self.clock.get_time()
 
+            if self.headless:
+                now = time.perf_counter()
+                self.headless_frame_times.append(now - frame_start)
+                frame_start = now
+                if self.main_loop_frame_count >= self.headless_frames:
+                    running = False
+
             for event in pygame.event.get():
                 # --- Track game quit ---
                 if event.type == pygame.QUIT:
@@ -1412,25 +1828,25 @@ class ClientGame:
 
                 # --- Track user's chosen input method ---
                 internal = self.entities["__internal_mouse__"]
-                current_method_of_input, previous_method_of_input = inputManager.resolve_active_input_method(event=event)
+                current_method_of_input, previous_method_of_input = self.world.input.resolve_active_input_method(event=event)
                 if current_method_of_input == "Default":
                     
                     # Ensure exactly one Cursor instance exists
                     if not internal:
                         cursor: py_sprites.Cursor
-                        cursor = inputManager.initialise_cursor(py_sprites.Cursor(),screen=self.screen)
+                        cursor = self.world.input.initialise_cursor(py_sprites.Cursor(),screen=self.screen)
                         internal.append(cursor)
 
                     # Update cursor position
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    mouse_x, mouse_y = window_to_screen(*pygame.mouse.get_pos(), config=self.world.config)
 
                     # If mouse is outside window, hide cursor
                     deadzone = 0 # eh it's useless, might keep incase of future incompatibility issues
                     if (
                         mouse_x <= deadzone or
-                        mouse_x >= config.res_x - deadzone or
+                        mouse_x >= self.world.config.res_x - deadzone or
                         mouse_y <= deadzone or
-                        mouse_y >= config.res_y - deadzone
+                        mouse_y >= self.world.config.res_y - deadzone
                     ):
                         self.entities["__internal_mouse__"].clear()
                         continue
@@ -1447,7 +1863,7 @@ class ClientGame:
 
                 # --- Track mouse clicks ---
                 cursor = internal[0] if internal else None
-                cursor_state = inputManager.update_mouse_input_state(event=event)
+                cursor_state = self.world.input.update_mouse_input_state(event=event)
                 if cursor and cursor_state == pygame.MOUSEBUTTONDOWN:
                     entity: py_sprites.Sprite
                     for entity in self.entitiesAllReturn():
@@ -1458,10 +1874,129 @@ class ClientGame:
 
                     
 
+        self.saveReplay() # quit mid-match, keep what we have
         pygame.quit()
         # profiler.stop()
         # profiler.open_in_browser()
 
+    def _debugNetText(self):
+        if not self.net_stats.totals:
+            return ""
+        rates = self.net_stats.summary()
+        return "".join(
+            f"NET {direction.upper()} _ {msgs:.1f}/S {nbytes / 1024:.2f}KB/S`"
+            for direction, (msgs, nbytes) in rates.items()
+        )
+
+    def _debugRollbackText(self):
+        session = self.online_rollback
+        if not session:
+            return ""
+        return (
+            f"ROLLBACK _ {session.rollback_depth} (MAX {session.rollback_depth_max})`"
+            f"RESIM _ {session.resim_ms:.2f}MS STALLS _ {session.stalled_frames}`"
+        )
+
+    def runFixedTimestep(self):
+        """
+        Advance the game in fixed 1/tick_rate ticks for the real time that passed, then draw once,
+        interpolated between the last two ticks. Game speed no longer depends on the frame rate.
+        """
+        step = 1 / self.world.config.tick_rate
+        now = time.perf_counter()
+        self.sim_accumulator += min(now - self.sim_last_time, SIM_MAX_FRAME_S)
+        self.sim_last_time = now
+
+        ticks = 0
+        while self.sim_accumulator >= step and ticks < SIM_MAX_CATCHUP_TICKS:
+            self.updateFrame()
+            self.sim_accumulator -= step
+            ticks += 1
+
+        # Too slow to keep up: drop the backlog rather than spiral further behind
+        if ticks == SIM_MAX_CATCHUP_TICKS:
+            self.sim_accumulator = min(self.sim_accumulator, step)
+
+        self.drawFrame(min(1.0, self.sim_accumulator / step))
+
+    def stepFrame(self):
+        """One tick + draw, without the display flip or frame cap (runReplay / headless)."""
+        self.updateFrame()
+        self.drawFrame()
+
+    def updateFrame(self):
+        """One game tick."""
+        # Increment frame counter (also what the per-frame entity caches key on)
+        self.main_loop_frame_count += 1
+
+        for entities in self.entities.values():
+            # Drop what the last tick marked for deletion (it has been drawn since)
+            if any(entity.mark_for_deletion for entity in entities):
+                entities[:] = [entity for entity in entities if not entity.mark_for_deletion]
+
+            # Interpolated draws go from here to wherever this tick moves things
+            for entity in entities:
+                entity.settle_position()
+
+        # If 'mode' changed, update inputManager
+        if self.mode_old != self.mode:
+            self.world.input.mode = self.mode
+            self.world.input.debug = self.debug
+            self.mode_old = self.mode
+
+        # Mode dispatch
+        self.update_methods.get(self.mode, lambda: print(f"mainloop : ⚠️  Warning: No update method implemented for self.mode: {self.mode}"))()
+
+    def drawFrame(self, alpha=1.0):
+        # static teams come baked into one background, only the rest is drawn sprite by sprite
+        background = self.static_layer.update(self.screen.get_size(), self.entities)
+        entities = [
+            e
+            for key, lst in self.entities.items()
+            if key not in BLACKLIST and key not in STATIC_LAYER_TEAMS
+            for e in lst
+        ] + self.entities["__internal_mouse__"]
+
+        if self.render_dirty_rects:
+            self.dirty_rects = self.renderer.draw(self.screen, entities, alpha, background)
+            return
+
+        self.screen.blit(background, (0, 0))
+        self.screen.blits(list(render_list(entities, alpha).values()), doreturn=False)
+
+    def openWindow(self, flags=0):
+        """(Re)open the window at config.window_res. Native render mode draws into an offscreen buffer instead."""
+        self.display = pygame.display.set_mode(self.world.config.window_res, flags)
+        if not self.world.config.native_render:
+            self.screen = self.display
+        elif self.screen is None or self.screen is self.display:
+            # same size whatever the window, so sprites / the stager can keep hold of it
+            self.screen = pygame.Surface((self.world.config.res_x, self.world.config.res_y)).convert()
+        if hasattr(self, "stager"):
+            self.stager.screen = self.screen
+        self.renderer.invalidate()
+        self.static_layer.invalidate()
+        self.dirty_rects = None
+
+    def presentFrame(self):
+        """Show the drawn frame (just its dirty rects if drawFrame left any); native render mode upscales it in one go."""
+        rects = self.dirty_rects if self.render_dirty_rects else None
+
+        if self.screen is not self.display:
+            if rects is None:
+                pygame.transform.scale(self.screen, self.display.get_size(), self.display)
+            else:
+                # from the surfaces, config.window_scale runs a frame ahead of the window after a rescale
+                factor = self.display.get_width() // self.screen.get_width()
+                rects = [pygame.Rect(r.x * factor, r.y * factor, r.w * factor, r.h * factor) for r in self.dirty_rects]
+                for area, window_area in zip(self.dirty_rects, rects):
+                    self.display.blit(pygame.transform.scale(self.screen.subsurface(area), window_area.size), window_area)
+
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
     # ========================================================
     # Utilities
     #region Utilities
@@ -1474,13 +2009,20 @@ class ClientGame:
 
     def rescaleWindow(self):
 
-        target_scale = config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
-        config.redefine(scale=target_scale)
+        target_scale = self.world.config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
+        self.world.config.redefine(scale=target_scale)
 
         # game
         self._game_settings_window_scale = target_scale
 
-        # clear caches
+        # native render: sprites never see the window size, presentFrame just scales up further
+        if self.world.config.native_render:
+            return self.world.config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
+
+        # clear caches (every cached scaled surface is the wrong size now)
+        surfaceCache.invalidate()
+        fontAtlas.invalidate()
+        self.static_layer.invalidate()
         self._invalidate_ui_caches()
         self._invalidate_entity_caches()
 
@@ -1488,7 +2030,7 @@ class ClientGame:
         for entity in self.entitiesAllReturn():
             entity.rescale()
 
-        return config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
+        return self.world.config.calculate_scale_against_pc_resolution(self.desktop_res_x, self.desktop_res_y)
     
     
 
@@ -1582,7 +2124,7 @@ class ClientGame:
 
     def _render_ui_gateway_solver(self, set_self_entities_ui_text, self_variable, justification: str | None = "centre"):
         if set_self_entities_ui_text != self_variable:
-            self.entities["ui"] = render_text(set_self_entities_ui_text,justification=justification)
+            self.entities["ui"] = self.ui_text.render(set_self_entities_ui_text,justification=justification)
         return set_self_entities_ui_text
 
     def _invalidate_entity_caches(self):
@@ -1595,6 +2137,8 @@ class ClientGame:
     def _invalidate_ui_caches(self):
         self.__debug_ui_cached_text = None
         self.__client_ui_cached_text = None
+        self.ui_text.reset()
+        self.debug_text.reset()
         print("CLEARED UI CACHE! (Things should appear back on the screen now!)")
     
 
@@ -1636,16 +2180,16 @@ class ClientGame:
                             if str(None) in value:
                                 value = self.window_best_scale
                                 self._game_settings_window_scale = value
-                                config.redefine(scale=value)
+                                self.world.config.redefine(scale=value)
                                 continue
                             else:
                                 value = int(value)
-                                config.redefine(scale=value)
+                                self.world.config.redefine(scale=value)
                                 self._game_settings_window_scale = value
                                 continue
                         case "volume":
-                            config.redefine(volume=float(value))
-                            self._game_settings_volume_multiplier = config.volume_multiplier
+                            self.world.config.redefine(volume=float(value))
+                            self._game_settings_volume_multiplier = self.world.config.volume_multiplier
                             continue
                         case "method":
                             self._game_settings_method = value
@@ -1704,14 +2248,14 @@ class ClientGame:
         # Sound timing (every half batch)
         if self.transition_tick % (CELLS_PER_FRAME // 2) == 0:
             self.transition_sfx_interval += 1
-            soundMixer.play("transition", "audio/transition.ogg",vol_mult=self._game_settings_volume_multiplier*0.1)
+            self.world.audio.play("transition", "audio/transition.ogg",vol_mult=self._game_settings_volume_multiplier*0.1)
 
 
 
         for _ in range(CELLS_PER_FRAME):
 
             # Spawn phase
-            if self.transition_spawned_rows <= config.MAX_ROW:
+            if self.transition_spawned_rows <= self.world.config.MAX_ROW:
                 ui_entities.append(
                     py_sprites.Cell().summon(
                         target_row=self.transition_spawned_rows,
@@ -1723,7 +2267,7 @@ class ClientGame:
 
                 # Advance grid position
                 self.transition_spawned_cols += 1
-                if self.transition_spawned_cols >= config.MAX_COL:
+                if self.transition_spawned_cols >= self.world.config.MAX_COL:
                     self.transition_spawned_cols = 0
                     self.transition_spawned_rows += 1
                 continue  # do not delete on the same iteration
@@ -1769,7 +2313,7 @@ class ClientGame:
         # -- Generate the usual 
         text = "``AVAILABLE LOBBIES``"
 
-        for i, lobby in enumerate(self.lobbies):
+        for i, lobby in enumerate(self.lobbies, start=self.lobby_page_offset):
 
             # Highlight current lobby
             is_current = lobby["id"] == self.lobby_id
@@ -1778,7 +2322,14 @@ class ClientGame:
             else:
                 # else, highlight selection if not in a lobby
                 prefix = "~GREEN> " if i == self.lobby_index and not self.lobby_id else "~#  "
-            text += f"{prefix}{lobby['name']} ({lobby['players']}/{lobby['max_players']})``"
+            if lobby.get("running"):
+                text += f"{prefix}{lobby['name']} ~CYAN(WATCH {lobby.get('spectators', 0)})~#``"
+            else:
+                text += f"{prefix}{lobby['name']} ({lobby['players']}/{lobby['max_players']})``"
+
+        # Page position
+        if self.lobby_total > len(self.lobbies):
+            text += f"~#({self.lobby_page_offset + 1}-{self.lobby_page_offset + len(self.lobbies)} / {self.lobby_total})``"
 
         # Bottom UI
         if self.lobby_id:
@@ -1789,6 +2340,8 @@ class ClientGame:
             )
         else:
             text += "````~#~YELLOW~(C)~# CREATE LOBBY``"
+            text += "~#~YELLOW~(Q)~# QUICK MATCH``"
+            text += f"~#~YELLOW~(F)~# FREE ONLY {'ON' if self.lobby_filter_free else 'OFF'}``"
 
 
         text += "~#~YELLOW~(ESCAPE)~# BACK``"
@@ -1801,6 +2354,44 @@ class ClientGame:
 
 # Entry
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PyPongOnline")
+    parser.add_argument("--record-replay", metavar="PATH", help="record offline games to PATH")
+    parser.add_argument("--replay", metavar="PATH", help="re-run a recorded offline game headless and exit")
+    parser.add_argument("--rollback", action="store_true", help="host online matches with rollback netcode")
+    parser.add_argument("--input-hz", type=float, default=INPUT_SEND_HZ, help="online input packets per second")
+    parser.add_argument("--netstats", metavar="PATH", help="append websocket message/bandwidth stats to PATH (JSONL)")
+    parser.add_argument("--headless", action="store_true", help="no window or audio, uncapped frame rate; exits with timing stats")
+    parser.add_argument("--frames", type=int, default=None, help="headless: frames to run (default 600, or to the end of --script)")
+    parser.add_argument("--script", metavar="PATH", help="headless: scripted keys, one '<frame> [K_NAME ...]' per line")
+    parser.add_argument("--mode", default=None, help="headless: mode to start in (e.g. offline-game-init)")
+    parser.add_argument("--full-redraw", action="store_true", help="redraw and flip the whole frame every frame (no dirty rects)")
+    parser.add_argument("--native-render", action="store_true", help="draw at 280x184 and upscale the whole frame to the window (resizing is free)")
+    args = parser.parse_args()
+
+    # SDL's dummy drivers: nothing opens a window or an audio device
+    if args.replay or args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if args.replay:
+        sys.exit(ClientGame().runReplay(args.replay))
+
+    # before any sprite exists, they are built for whatever resolution_scale is then
+    default_world.config.set_native_render(args.native_render)
+
+    if args.headless:
+        world = World(default_world.config, default_world.rng, default_world.input, SoundMixer(enabled=False))
+        game = ClientGame(world)
+        game.replay_record_path = args.record_replay
+        game.render_dirty_rects = not args.full_redraw
+        sys.exit(game.runHeadless(args.frames, args.script, args.mode))
 
     # run the main game
-    ClientGame().mainloop()
+    game = ClientGame()
+    game.replay_record_path = args.record_replay
+    if args.rollback:
+        game.net_netcode = "rollback"
+    game.net_input_send_hz = args.input_hz
+    game.net_stats_path = args.netstats
+    game.render_dirty_rects = not args.full_redraw
+    game.mainloop()
@@ -18,7 +18,13 @@ class Config:
         self.last_resolution_scale = scale
         self.res_x = self.RES_X_INIT * scale
         self.res_y = self.RES_Y_INIT * scale
+        # Window size multiplier. Same as resolution_scale, except in native render mode, where
+        # everything is drawn at RES_*_INIT (resolution_scale 1) and the frame is upscaled to the window
+        self.window_scale = scale
+        self.native_render = False
         self.frame_rate = framerate
+        # Game logic always advances in 1/tick_rate steps, frame_rate only caps drawing
+        self.tick_rate = 60
         self.clock = pygame.time.Clock()
 
         self.volume_multiplier = 1
@@ -35,10 +41,12 @@ class Config:
             # Store previous scale (left intact for sprites until they rescale)
             old = self.resolution_scale
 
-            # Update derived values
-            self.resolution_scale = scale
-            self.res_x = self.RES_X_INIT * scale
-            self.res_y = self.RES_Y_INIT * scale
+            # Update derived values (native render: only the window changes, sprites stay put)
+            self.window_scale = scale
+            if not self.native_render:
+                self.resolution_scale = scale
+                self.res_x = self.RES_X_INIT * scale
+                self.res_y = self.RES_Y_INIT * scale
 
             # Optional: return tuple(old, new) so caller may trigger rescale on sprites
             return scale
@@ -50,6 +58,18 @@ class Config:
             return clock
         if volume is not None:
             self.volume_multiplier = volume
+
+    def set_native_render(self, enabled: bool):
+        """Draw at native resolution and upscale once per frame. Set it before any sprite exists."""
+        self.native_render = enabled
+        scale = 1 if enabled else self.window_scale
+        self.resolution_scale = self.last_resolution_scale = scale
+        self.res_x = self.RES_X_INIT * scale
+        self.res_y = self.RES_Y_INIT * scale
+
+    @property
+    def window_res(self) -> tuple[int, int]:
+        return self.RES_X_INIT * self.window_scale, self.RES_Y_INIT * self.window_scale
     
     def calculate_scale_against_pc_resolution(self, desktop_res_x, desktop_res_y) -> int:
         """
@@ -63,7 +83,7 @@ class Config:
         max_scale = min(max_scale_x, max_scale_y)
 
         # Increment scale
-        next_scale = self.resolution_scale + 1
+        next_scale = self.window_scale + 1
         
         # # If we're one away from max, go fullscreen
         # if next_scale == max_scale:
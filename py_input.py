@@ -1,6 +1,7 @@
-import pygame, threading, asyncio
+import pygame, threading, asyncio, bisect
 from pygame import joystick
-from py_render import pixel_to_grid
+from py_render import pixel_to_grid, window_to_screen
+from py_config import Config, config as default_config
 
 # Using Xbox's scheme!
 DEFAULT_CONTROLLER_BUTTON_MAP = {
@@ -72,9 +73,52 @@ CONTROLLER_AXIS_MAP = {
 
 
 
+#region Key sources
+class PressedKeys:
+    """Stands in for pygame.key.get_pressed() when keys come from a replay or a script."""
+    def __init__(self, pressed: frozenset):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+    def __iter__(self):
+        # any(keys) works, without falling back to __getitem__(0), (1), ... forever
+        return iter([True] * len(self.pressed))
+
+
+class InputScript:
+    """
+    Scripted key input for headless runs. One line per change:  <frame> [K_NAME ...]
+    The keys are held from that frame until the next line (no keys = release everything).
+    """
+    def __init__(self, path):
+        self._frames: list[int] = []
+        self._keys: list[frozenset] = []
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, raw in enumerate(f, 1):
+                line = raw.split("#", 1)[0].split()
+                if not line:
+                    continue
+                codes = [getattr(pygame, name, None) for name in line[1:]]
+                if None in codes:
+                    raise ValueError(f"{path}:{line_no}: unknown key in {line[1:]}")
+                self._frames.append(int(line[0]))
+                self._keys.append(frozenset(codes))
+
+    @property
+    def last_frame(self) -> int:
+        return self._frames[-1] if self._frames else 0
+
+    def keys_at(self, frame: int) -> frozenset:
+        i = bisect.bisect_right(self._frames, frame) - 1
+        return self._keys[i] if i >= 0 else frozenset()
+
+
 #region InputManager
 class InputManager:
-    def __init__(self):
+    def __init__(self, config: Config = default_config):
         self.mode = None  # updated externally in client.py main loop.
         self.mode_old = None
         self.debug = False  # updated externally in client.py main loop.
@@ -92,6 +136,16 @@ class InputManager:
         pygame.joystick.init()
         self.controller_thread = None
         self.controllers = []
+        self.config = config
+
+        # Keys to report instead of the keyboard's (headless --script), see get_pressed
+        self.scripted_keys: frozenset | None = None
+
+    def get_pressed(self):
+        """pygame.key.get_pressed(), or the scripted keys while a script is driving input."""
+        if self.scripted_keys is not None:
+            return PressedKeys(self.scripted_keys)
+        return pygame.key.get_pressed()
     
     #region Mouse
     def initialise_cursor(self, cursor_object, screen):
@@ -99,8 +153,8 @@ class InputManager:
         return self.mouse_object
     
     def update_mouse_positioning_attributes(self, mouse_position) -> None:
-        self.mouse_pos_x, self.mouse_pos_y = mouse_position[0], mouse_position[1]
-        grid_space = pixel_to_grid(self.mouse_pos_x, self.mouse_pos_y)
+        self.mouse_pos_x, self.mouse_pos_y = window_to_screen(*mouse_position, config=self.config)
+        grid_space = pixel_to_grid(self.mouse_pos_x, self.mouse_pos_y, config=self.config)
         self.mouse_pos_row, self.mouse_pos_col = grid_space["row"], grid_space["col"]
 
     def update_mouse_input_state(self, event):
@@ -155,6 +209,16 @@ class InputManager:
 
         return "XBOX"  # fallback for generic controllers
     
+    def start_controller_polling(self):
+        """Start the controller refresh thread, once. Games call this; importing py_input doesn't."""
+        if self.controller_thread and self.controller_thread.is_alive():
+            return
+        self.controller_thread = threading.Thread(
+            target=self.get_latest_controllers,
+            daemon=True
+        )
+        self.controller_thread.start()
+
     def get_latest_controllers(self):
         while True:
             self.controllers = [
@@ -368,15 +432,9 @@ class InputManager:
 
 
 
-# singleton instance
+# singleton instance (its controller thread starts with the game, see start_controller_polling)
 inputManager = InputManager()
 
-inputManager.controller_thread = threading.Thread(
-    target=inputManager.get_latest_controllers,
-    daemon=True
-)
-inputManager.controller_thread.start()
-
 
 
 #region INPUT_MODES
@@ -469,6 +527,14 @@ INPUT_MODES = {
             "K_l",
             InputManager.controller_button("x"),
         ],
+        "quick": [
+            "K_q",
+            InputManager.controller_button("y"),
+        ],
+        "filter": [
+            "K_f",
+            InputManager.controller_button("rb"),
+        ],
         "back": [
             *InputManager.universal_back()
         ],
@@ -486,6 +552,24 @@ INPUT_MODES = {
         ],
     },
 
+    "online-game": {
+        "up": [
+            "K_UP",
+            "K_w",
+            InputManager.controller_thumbstick(axis="left_y", threshold=0.1, direction="up"),
+            InputManager.controller_button("dpad_up"),
+        ],
+        "down": [
+            "K_DOWN",
+            "K_s",
+            InputManager.controller_thumbstick(axis="left_y", threshold=0.1, direction="down"),
+            InputManager.controller_button("dpad_down"),
+        ],
+        "back": [
+            *InputManager.universal_back()
+        ],
+    },
+
     "offline-game": {
         "up": [
             "K_UP",
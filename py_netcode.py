@@ -0,0 +1,157 @@
+# py_netcode.py - client side netcode: batched input packets, and rollback for 1v1 matches
+#
+# Inputs: every sampled input gets a sequence number (the sim tick, under rollback). Packets go out
+# at INPUT_SEND_HZ, whatever the render FPS, and carry the newest INPUT_REDUNDANCY inputs, so one
+# late/lost packet is covered by the next. The server drops anything it has already seen by seq.
+#
+# Rollback: the match runs locally on a py_simulation copy (fixed point, so both players stay bit-identical).
+# Our paddle never waits on the network, the remote one is predicted, and when the real remote input
+# turns up different we rewind to a saved snapshot and re-simulate back to the present.
+
+import time, json
+
+from collections import deque
+
+from py_simulation import PongSimulation, TICK_RATE
+
+INPUT_SEND_HZ = 30
+INPUT_REDUNDANCY = 8
+
+# Furthest we will run ahead of the last confirmed remote input (and so the deepest rollback).
+# 8 ticks of a 60Hz sim re-simulate in well under a millisecond, far inside a 16ms frame.
+ROLLBACK_MAX_FRAMES = 8
+
+
+#region InputBatcher
+class InputBatcher:
+    def __init__(self, send_hz=INPUT_SEND_HZ, redundancy=INPUT_REDUNDANCY):
+        self.send_hz = send_hz
+        self.redundancy = redundancy
+        # enough to cover a couple of seconds without a send (e.g. the window was dragged)
+        self.history = deque(maxlen=max(redundancy, 2 * TICK_RATE))
+        self.seq = 0 # seq of the newest input
+        self.unsent = 0
+        self.last_send = 0.0
+
+    def push(self, direction: int, seq: int | None = None):
+        """Queue an input; `seq` defaults to the next number (rollback passes the tick)."""
+        self.seq = self.seq + 1 if seq is None else seq
+        self.history.append(direction)
+        self.unsent += 1
+
+    def poll(self, now: float) -> str | None:
+        """The encoded packet if one is due, else None."""
+        if not self.unsent or now - self.last_send < 1 / self.send_hz:
+            return None
+
+        count = min(len(self.history), max(self.redundancy, self.unsent))
+        dirs = list(self.history)[-count:]
+        self.unsent = 0
+        self.last_send = now
+        return json.dumps({"type": "input", "seq": self.seq, "dirs": dirs})
+
+
+def unpack_inputs(msg: dict):
+    """(seq, dir) pairs from an input / peer_input packet, oldest first."""
+    dirs = msg["dirs"]
+    first = msg["seq"] - len(dirs) + 1
+    return [(first + i, direction) for i, direction in enumerate(dirs)]
+
+
+#region RollbackSession
+class RollbackSession:
+    def __init__(self, sim: PongSimulation, local_slot: int, max_frames=ROLLBACK_MAX_FRAMES):
+        self.sim = sim
+        self.local_slot = local_slot
+        self.max_frames = max_frames
+
+        self.local_inputs: dict[int, int] = {}   # tick -> dir we pressed
+        self.remote_inputs: dict[int, int] = {}  # tick -> dir the peer confirmed
+        self.remote_tick = 0                     # newest confirmed remote tick
+        self.used_remote: dict[int, int] = {}    # tick -> dir we actually simulated the peer with
+        self.snapshots: dict[int, tuple] = {sim.tick: sim.get_state()} # tick -> state after that tick
+        self.rollback_from = None                # earliest tick simulated with a wrong guess
+
+        # Stats (debug overlay)
+        self.rollback_depth = 0
+        self.rollback_depth_max = 0
+        self.resim_ms = 0.0
+        self.stalled_frames = 0
+
+    #region Inputs
+    def add_remote_input(self, tick: int, direction: int):
+        if tick in self.remote_inputs:
+            return
+        self.remote_inputs[tick] = direction
+        self.remote_tick = max(self.remote_tick, tick)
+
+        used = self.used_remote.get(tick)
+        if used is not None and used != direction:
+            if self.rollback_from is None or tick < self.rollback_from:
+                self.rollback_from = tick
+
+    def _predict_remote(self):
+        # the peer is most likely still doing whatever it last did
+        return self.remote_inputs.get(self.remote_tick, 0)
+
+    def _inputs_for(self, tick):
+        remote = self.remote_inputs.get(tick)
+        if remote is None:
+            remote = self._predict_remote()
+        self.used_remote[tick] = remote
+
+        inputs = [0, 0]
+        inputs[self.local_slot] = self.local_inputs.get(tick, 0)
+        inputs[1 - self.local_slot] = remote
+        return inputs
+
+    #region Advance
+    def advance(self, local_dir: int) -> list[str] | None:
+        """
+        Fix up any mispredictions, then simulate the next tick.
+        Returns the tick's events, or None if nothing was simulated (the match is over, or we
+        are too far ahead of the peer and must wait).
+        """
+        self._rollback()
+
+        if self.sim.finished:
+            return None
+
+        if self.sim.tick - self.remote_tick >= self.max_frames:
+            self.stalled_frames += 1
+            return None
+
+        tick = self.sim.tick + 1
+        self.local_inputs[tick] = local_dir
+        events = self.sim.step(self._inputs_for(tick))
+        self.snapshots[self.sim.tick] = self.sim.get_state()
+
+        self._prune()
+        return events
+
+    def _rollback(self):
+        if self.rollback_from is None:
+            self.rollback_depth = 0
+            return
+
+        start = time.perf_counter()
+        present = self.sim.tick
+
+        self.sim.set_state(self.snapshots[self.rollback_from - 1])
+        while self.sim.tick < present and not self.sim.finished:
+            tick = self.sim.tick + 1
+            self.sim.step(self._inputs_for(tick))
+            self.snapshots[tick] = self.sim.get_state()
+
+        self.rollback_depth = present - self.rollback_from + 1
+        self.rollback_depth_max = max(self.rollback_depth_max, self.rollback_depth)
+        self.resim_ms = (time.perf_counter() - start) * 1000
+        self.rollback_from = None
+
+    def _prune(self):
+        # nothing at or before the confirmed tick can be rolled back any more
+        # (keep its snapshot, it is where the next rollback starts from)
+        oldest = min(self.remote_tick, self.sim.tick)
+        for table in (self.snapshots, self.local_inputs, self.used_remote, self.remote_inputs):
+            for tick in [t for t in table if t < oldest]:
+                del table[tick]
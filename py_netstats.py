@@ -0,0 +1,113 @@
+# py_netstats.py - message / bandwidth counters for a websocket, shared by the client and the server
+#
+# Every message in or out is counted under its "type" (the JSON field everything we send starts with),
+# as totals plus one bucket per wall-clock second, so rates are a rolling average over the last
+# NETSTATS_WINDOW_S whole seconds. snapshot() is what /metrics and the JSONL dumps show.
+
+import json, time, threading
+
+from collections import deque
+from pathlib import Path
+
+NETSTATS_WINDOW_S = 5
+# How often the owners append a snapshot to their JSONL file
+NETSTATS_DUMP_S = 10
+
+TYPE_PREFIX = '{"type": "'
+
+
+def message_type(raw) -> str:
+    """The "type" of an encoded message, without decoding the whole thing (json.dumps puts it first)."""
+    if isinstance(raw, bytes):
+        return "binary"
+    if raw.startswith(TYPE_PREFIX):
+        end = raw.find('"', len(TYPE_PREFIX))
+        if end != -1:
+            return raw[len(TYPE_PREFIX):end]
+    return "other"
+
+
+class NetStats:
+    """
+    Counts messages and bytes per direction ("in" / "out") and message type.
+    Thread safe: the client records from its network thread and reads from the game loop.
+    """
+
+    def __init__(self, window_s=NETSTATS_WINDOW_S):
+        self.window_s = window_s
+        self.started = time.time()
+        self.totals: dict[tuple[str, str], list[int]] = {}  # (direction, type) -> [msgs, bytes]
+        self._buckets = deque()                             # (second, {(direction, type): [msgs, bytes]})
+        self._lock = threading.Lock()
+
+    def record(self, direction: str, msg_type: str, nbytes: int, now: float | None = None):
+        second = int(time.time() if now is None else now)
+        key = (direction, msg_type)
+
+        with self._lock:
+            total = self.totals.setdefault(key, [0, 0])
+            total[0] += 1
+            total[1] += nbytes
+
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append((second, {}))
+                while self._buckets[0][0] <= second - self.window_s - 1:
+                    self._buckets.popleft()
+
+            bucket = self._buckets[-1][1].setdefault(key, [0, 0])
+            bucket[0] += 1
+            bucket[1] += nbytes
+
+    def rates(self, now: float | None = None) -> dict[tuple[str, str], tuple[float, float]]:
+        """(direction, type) -> (msgs/s, bytes/s) over the last `window_s` whole seconds."""
+        second = int(time.time() if now is None else now)
+        # the current second is still filling up, leave it out
+        oldest = second - self.window_s
+
+        sums: dict[tuple[str, str], list[int]] = {}
+        with self._lock:
+            for bucket_second, counts in self._buckets:
+                if oldest <= bucket_second < second:
+                    for key, (msgs, nbytes) in counts.items():
+                        acc = sums.setdefault(key, [0, 0])
+                        acc[0] += msgs
+                        acc[1] += nbytes
+
+        return {key: (msgs / self.window_s, nbytes / self.window_s) for key, (msgs, nbytes) in sums.items()}
+
+    def summary(self, now: float | None = None) -> dict[str, tuple[float, float]]:
+        """direction -> (msgs/s, bytes/s), all types added up (debug overlay)."""
+        out = {"in": (0.0, 0.0), "out": (0.0, 0.0)}
+        for (direction, _), (msgs, nbytes) in self.rates(now).items():
+            out[direction] = (out[direction][0] + msgs, out[direction][1] + nbytes)
+        return out
+
+    def snapshot(self, now: float | None = None) -> dict:
+        now = time.time() if now is None else now
+        rates = self.rates(now)
+
+        with self._lock:
+            totals = dict(self.totals)
+
+        directions = {"in": {}, "out": {}}
+        for (direction, msg_type), (msgs, nbytes) in sorted(totals.items()):
+            msgs_s, bytes_s = rates.get((direction, msg_type), (0.0, 0.0))
+            directions[direction][msg_type] = {
+                "msgs": msgs,
+                "bytes": nbytes,
+                "msgs_s": round(msgs_s, 2),
+                "bytes_s": round(bytes_s, 1),
+            }
+
+        return {"time": round(now, 3), "uptime_s": round(now - self.started, 1), "window_s": self.window_s, **directions}
+
+    # -- Disk side (blocking, keep off the game loop / event loop)
+    def dump(self, path, snapshot: dict | None = None):
+        """Append one snapshot as a JSON line."""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            print(f"[NetStats] Failed to write {path}: {e}")
@@ -1,5 +1,8 @@
 import pygame
-import math
+import math, threading
+
+from collections import OrderedDict
+from pathlib import Path
 
 from py_resource import resource_path
 from py_config import config
@@ -12,6 +15,16 @@ def recolourSprite(surface: pygame.Surface, new_colour, preserve_alpha=True):
     if new_colour is None:
         return surface.copy()
 
+    # 8-bit (see palettizeSprite): just multiply the palette, the pixels stay as they are
+    if surface.get_bitsize() == 8:
+        surf = surface.copy()
+        transparent = surf.map_rgb(surf.get_colorkey()) if surf.get_colorkey() else None
+        surf.set_palette([
+            colour if i == transparent else [_mult(c, t) for c, t in zip(colour[:3], new_colour)]
+            for i, colour in enumerate(surface.get_palette())
+        ])
+        return surf
+
     surf = surface.copy().convert_alpha()
 
     # Create solid colour surface the same size and blend multiply
@@ -20,6 +33,45 @@ def recolourSprite(surface: pygame.Surface, new_colour, preserve_alpha=True):
     surf.blit(tint, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
     return surf
 
+def _mult(a, b):
+    # same rounding as BLEND_RGBA_MULT, so both tint paths give identical pixels
+    return ((a * b) + 255) >> 8 if a and b else 0
+
+# Sprite folders holding flat-coloured art (glyphs, confetti). These get palettized on load, so
+# every tint of them is a palette swap on the shared pixels.
+PALETTE_SPRITE_DIRS = ("font", "particle")
+PALETTE_TRANSPARENT = (255, 0, 255) # index 0, the colorkey
+
+def palettizeSprite(surface: pygame.Surface) -> pygame.Surface | None:
+    """
+    8-bit copy of `surface` with index 0 as the transparent colorkey.
+    None if it can't be one without changing how it looks (soft alpha edges, > 255 colours).
+    """
+    w, h = surface.get_size()
+    colours = {}
+    pixels = []
+    for y in range(h):
+        for x in range(w):
+            r, g, b, a = surface.get_at((x, y))
+            if a == 0:
+                pixels.append(0)
+                continue
+            if a != 255:
+                return None
+            index = colours.setdefault((r, g, b), len(colours) + 1)
+            if index > 255:
+                return None
+            pixels.append(index)
+
+    indexed = pygame.Surface((w, h), 0, 8)
+    indexed.set_palette([PALETTE_TRANSPARENT, *colours])
+    indexed.set_colorkey(0)
+    array = pygame.PixelArray(indexed)
+    for i, index in enumerate(pixels):
+        array[i % w, i // w] = index
+    array.close()
+    return indexed
+
 def loadSprite(spritesheet, pos=(-100, -100)):
     """
     Load a sprite path provided in an iterable (expected: [PathLike]).
@@ -51,15 +103,205 @@ def scaleSprite(entity, surface, factor, smooth=False):
         pass
     return pygame.transform.smoothscale(surface, new_size) if smooth else pygame.transform.scale(surface, new_size)
 
+# Decoded/tinted/scaled surfaces, shared by every sprite in the process.
+# Sprites never draw onto their surfaces, so one copy per (path, tint, scale) is enough.
+SURFACE_CACHE_MAX = 1024
+
+class SurfaceCache:
+    """
+    LRU of surfaces keyed by (path, tint, scale). scale None = the unscaled image, tint None = untinted;
+    each level is built from the one below it (load -> tint -> scale), so those get cached too.
+    Images under PALETTE_SPRITE_DIRS stay 8-bit all the way up, so their tints never touch pixels.
+    """
+
+    def __init__(self, max_entries=SURFACE_CACHE_MAX):
+        self.max_entries = max_entries
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self._lock = threading.Lock() # background text renders build glyphs on other threads
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path, tint: tuple[int,int,int] | None = None, scale: float | None = None) -> pygame.Surface:
+        key = (str(path), tuple(tint) if tint is not None else None, scale)
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self._surfaces.move_to_end(key)
+                self.hits += 1
+                return surface
+            self.misses += 1
+
+        if scale is not None:
+            surface = scaleSprite(None, self.get(path, tint), scale)
+        elif tint is not None:
+            surface = recolourSprite(self.get(path), tint)
+        else:
+            surface = loadSprite([path])
+            if Path(path).parent.name in PALETTE_SPRITE_DIRS:
+                surface = palettizeSprite(surface) or surface
+
+        with self._lock:
+            self._surfaces[key] = surface
+            while len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+                self.evictions += 1
+        return surface
+
+    def invalidate(self):
+        """Drop everything (the window was rescaled, so every scaled surface is stale anyway)."""
+        with self._lock:
+            self._surfaces.clear()
+            self.invalidations += 1
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+# Singleton instance
+surfaceCache = SurfaceCache()
+
+
+def render_list(entities, alpha=1.0) -> dict:
+    """entity -> (surface, rect) for everything visible, in draw order; ready for Surface.blits(list(....values()))."""
+    return {e: (e.surface_render, e.draw_rect(alpha)) for e in entities if e.surface_render}
+
+
+# Teams that never move or animate once spawned (pregame border, centre line, goals, menu logo)
+STATIC_LAYER_TEAMS = ("goals", "decor")
+
+class StaticLayer:
+    """
+    The static teams pre-drawn onto one background surface. Re-baked only when a team's membership
+    changes, the target size changes or invalidate() is called (rescale), so a frame costs one blit.
+    """
+
+    def __init__(self, teams=STATIC_LAYER_TEAMS, background=(0, 0, 0)):
+        self.teams = teams
+        self.background = background
+        self.surface: pygame.Surface | None = None
+        self._members: list = []
+        self.bakes = 0
+
+    def invalidate(self):
+        self.surface = None
+
+    def update(self, size, entities: dict) -> pygame.Surface:
+        """The baked background for `entities` (team -> list), re-baking it first if it is stale."""
+        members = [entity for team in self.teams for entity in entities[team]]
+        if self.surface is not None and self.surface.get_size() == tuple(size) and members == self._members:
+            return self.surface
+
+        self._members = members
+        self.surface = pygame.Surface(size).convert()
+        self.surface.fill(self.background)
+        self.surface.blits(list(render_list(members).values()), doreturn=False)
+        self.bakes += 1
+        return self.surface
+
+
+# Past this share of the screen changing, one full redraw + flip beats clipping to every rect
+DIRTY_FULL_REDRAW_RATIO = 0.35
+
+class DirtyRectRenderer:
+    """
+    Draws a frame by only repainting what changed since the previous one.
+    Every sprite's (surface, rect) is remembered; a sprite that moved, swapped frames, appeared or went
+    away dirties its old and new rects, those get cleared and everything overlapping them is redrawn
+    (clipped, so draw order still holds). draw() returns the rects for display.update(), or None when
+    it did a full redraw and the caller should flip.
+    Cleared areas are restored from `background` (a StaticLayer surface) when one is given.
+    """
+
+    def __init__(self, full_redraw_ratio=DIRTY_FULL_REDRAW_RATIO, background=(0, 0, 0)):
+        self.full_redraw_ratio = full_redraw_ratio
+        self.background = background
+        self._drawn: dict = {} # entity -> (surface, rect), as of the last frame
+        self._background = None
+        self._full = True
+
+        # Stats (debug overlay)
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.last_rects = 0
+
+    def invalidate(self):
+        """Next frame is a full redraw (new window / buffer, or something drew over the screen)."""
+        self._full = True
+
+    def draw(self, screen: pygame.Surface, entities, alpha=1.0, background: pygame.Surface | None = None) -> list[pygame.Rect] | None:
+        if background is not self._background:
+            self._background = background
+            self._full = True
+
+        drawn = render_list(entities, alpha)
+        previous, self._drawn = self._drawn, drawn
+        bounds = screen.get_rect()
+
+        dirty = []
+        if not self._full:
+            for entity, state in drawn.items():
+                old = previous.pop(entity, None)
+                if old != state:
+                    dirty.append(state[1])
+                    if old:
+                        dirty.append(old[1])
+            # whatever is left is gone
+            dirty += [rect for _, rect in previous.values()]
+            dirty = self._merge(dirty, bounds)
+
+        if self._full or sum(r.w * r.h for r in dirty) > bounds.w * bounds.h * self.full_redraw_ratio:
+            self._full = False
+            self.full_frames += 1
+            self.last_rects = 0
+            if background:
+                screen.blit(background, (0, 0))
+            else:
+                screen.fill(self.background)
+            screen.blits([(surface, rect) for surface, rect in drawn.values()], doreturn=False)
+            return None
+
+        self.partial_frames += 1
+        self.last_rects = len(dirty)
+        if dirty:
+            states = list(drawn.values())
+            rects = [rect for _, rect in states]
+            clip = screen.get_clip()
+            for area in dirty:
+                screen.set_clip(area)
+                if background:
+                    screen.blit(background, area, area)
+                else:
+                    screen.fill(self.background, area)
+                screen.blits([states[i] for i in area.collidelistall(rects)], doreturn=False)
+            screen.set_clip(clip)
+        return dirty
+
+    @staticmethod
+    def _merge(rects, bounds):
+        # overlapping rects become one, so nothing is cleared and redrawn twice
+        merged = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if not rect.w or not rect.h:
+                continue
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
 # Grid/pixel helpers
-def grid_to_pixel(row=None, col=None):
-    """ Convert from gridspace to pixelspace -> returns dict["x"] and dict["y"]"""
+def grid_to_pixel(row=None, col=None, config=config):
+    """ Convert from gridspace to pixelspace -> returns dict["x"] and dict["y"] (`config`: the world's, defaults to the client's)"""
     x = col * config.CELL_SIZE * config.resolution_scale if col is not None else None
     y = row * config.CELL_SIZE * config.resolution_scale if row is not None else None
     return {"x": x, "y": y}
 
 
-def pixel_to_grid(x=None, y=None): # integers
+def pixel_to_grid(x=None, y=None, config=config): # integers
     """ Convert from pixelspace to gridspace -> returns dict["row"] and dict["col"]"""
     col = math.floor(x / (config.CELL_SIZE * config.resolution_scale))
     row = math.floor(y / (config.CELL_SIZE * config.resolution_scale))
@@ -67,4 +309,10 @@ def pixel_to_grid(x=None, y=None): # integers
     if type(col) is float or type(row) is float:
         raise ArithmeticError("Must cast `int(pos_x),int(pos_y)`")
 
-    return {"row": row, "col": col}
\ No newline at end of file
+    return {"row": row, "col": col}
+
+
+def window_to_screen(x, y, config=config):
+    """ Window pixel (mouse) -> pixel on the surface sprites draw to; they differ in native render mode """
+    ratio = config.resolution_scale / config.window_scale
+    return int(x * ratio), int(y * ratio)
@@ -0,0 +1,286 @@
+# py_replay.py - compact binary match logs, plus a playback tool for the server ones
+#
+# File layout: MAGIC, then records of  [u16 length][u8 kind][payload]
+#
+# Server rooms (.pongrec)
+#   HEADER    seed, tick rate, match length, fixed point physics flag, room name
+#   INPUT     tick the inputs apply from, one signed byte per paddle (only written on change)
+#   KEYFRAME  full PongSimulation.get_state(), so playback can seek without replaying from 0
+#   END       last tick, scores, reason
+#
+# Offline client games (.pongkeys), replayed by `py_client.py --replay`
+#   HEADER    seed, match length, tick rate and resolution scale (both feed the game logic)
+#   KEYS      tick, then the pressed key codes (only written on change)
+#   END       last tick, scores
+#
+# Usage:  python py_replay.py replays/<room>.pongrec [--seek TICK]
+
+import struct, bisect, time, sys, argparse
+
+from pathlib import Path
+
+from py_simulation import PongSimulation, TICK_RATE, new_simulation
+
+MAGIC = b"PPRP\x02"
+CLIENT_MAGIC = b"PPCR\x01"
+
+KIND_HEADER = 0
+KIND_INPUT = 1
+KIND_KEYFRAME = 2
+KIND_END = 3
+
+LENGTH = struct.Struct("<H")
+HEADER = struct.Struct("<BIHH?")
+INPUT = struct.Struct("<BIbb")
+# tick, ticks_left, scores x2, halt, finished, paddle_y x2, paddle_y_prev x2,
+# ball x/y/vx/vy/speed, owner (-1 = none), edge_buffer
+# (paddles are i32 and the ball doubles so FixedPongSimulation's subpixel ints fit exactly)
+STATE = struct.Struct("<IiHHH?iiiidddddbB")
+KEYFRAME = struct.Struct("<B" + STATE.format[1:])
+END = struct.Struct("<BIHH")
+
+CLIENT_HEADER = struct.Struct("<BIHdd")
+KEYS = struct.Struct("<BI")
+KEY_CODE = struct.Struct("<I")
+
+# One keyframe every 5 seconds of match time
+KEYFRAME_INTERVAL_TICKS = 5 * TICK_RATE
+
+
+#region Writing
+class ReplayWriter:
+    """
+    Appends records to an in-memory buffer; nothing here touches the disk.
+    The owner hands take() chunks to write() on another thread (the server uses a
+    single worker executor, so chunks land in order).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._buffer = bytearray(MAGIC)
+        self._file = None
+        self._last_inputs = None
+
+    def _record(self, payload: bytes):
+        self._buffer += LENGTH.pack(len(payload))
+        self._buffer += payload
+
+    def header(self, sim: PongSimulation, name: str):
+        self._record(HEADER.pack(KIND_HEADER, sim.seed, TICK_RATE, sim.match_seconds, sim.fixed_point) + name.encode("utf-8"))
+        self.keyframe(sim)
+
+    def inputs(self, tick: int, inputs):
+        """Call before sim.step(); only records when the inputs actually changed."""
+        inputs = tuple(inputs)
+        if inputs != self._last_inputs:
+            self._last_inputs = inputs
+            self._record(INPUT.pack(KIND_INPUT, tick, *inputs))
+
+    def keyframe(self, sim: PongSimulation):
+        self._record(KEYFRAME.pack(KIND_KEYFRAME, *sim.get_state()))
+
+    def end(self, sim: PongSimulation, reason: str):
+        self._record(END.pack(KIND_END, sim.tick, *sim.scores) + reason.encode("utf-8"))
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def take(self) -> bytes:
+        chunk, self._buffer = bytes(self._buffer), bytearray()
+        return chunk
+
+    # -- Disk side (blocking, keep off the tick path)
+    def write(self, chunk: bytes):
+        try:
+            if self._file is None:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self._file.write(chunk)
+            self._file.flush()
+        except OSError as e:
+            print(f"[Replay] Failed to write {self.path}: {e}")
+
+    def close(self, chunk: bytes = b""):
+        if chunk:
+            self.write(chunk)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def read_records(data: bytes, magic: bytes, path=""):
+    """Yield each record's payload; stops quietly at a torn final record (crash mid-write)."""
+    if not data.startswith(magic):
+        raise ValueError(f"{path} is not a replay (bad magic)")
+
+    offset = len(magic)
+    while offset + LENGTH.size <= len(data):
+        (length,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        payload = data[offset:offset + length]
+        offset += length
+        if len(payload) < length or not payload:
+            return
+        yield payload
+
+
+#region Reading
+class Replay:
+    def __init__(self, path):
+        self.seed = 0
+        self.tick_rate = TICK_RATE
+        self.match_seconds = 0
+        self.fixed_point = False
+        self.name = ""
+        self.inputs: list[tuple[int, tuple]] = []     # (tick, inputs), ascending
+        self.keyframes: list[tuple[int, tuple]] = []  # (tick, state), ascending
+        self.end = None                               # (tick, scores, reason) or None if cut short
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        for payload in read_records(data, MAGIC, path):
+            match payload[0]:
+                case 0: # KIND_HEADER
+                    _, self.seed, self.tick_rate, self.match_seconds, self.fixed_point = HEADER.unpack_from(payload)
+                    self.name = payload[HEADER.size:].decode("utf-8", "replace")
+                case 1: # KIND_INPUT
+                    _, tick, *inputs = INPUT.unpack(payload)
+                    self.inputs.append((tick, tuple(inputs)))
+                case 2: # KIND_KEYFRAME
+                    state = KEYFRAME.unpack(payload)[1:]
+                    self.keyframes.append((state[0], state))
+                case 3: # KIND_END
+                    _, tick, *scores = END.unpack_from(payload)
+                    self.end = (tick, scores, payload[END.size:].decode("utf-8", "replace"))
+
+        self._input_ticks = [tick for tick, _ in self.inputs]
+        self._keyframe_ticks = [tick for tick, _ in self.keyframes]
+
+    @property
+    def last_tick(self) -> int:
+        if self.end:
+            return self.end[0]
+        return max(self._keyframe_ticks[-1:] + self._input_ticks[-1:] + [0])
+
+    def inputs_at(self, tick: int) -> tuple:
+        """The inputs in effect for the step that produces `tick`."""
+        i = bisect.bisect_right(self._input_ticks, tick) - 1
+        return self.inputs[i][1] if i >= 0 else (0, 0)
+
+    def simulate(self, until_tick=None, use_keyframes=True) -> PongSimulation:
+        """
+        Re-simulate up to `until_tick` (default: the end).
+        With `use_keyframes` it starts from the nearest keyframe instead of tick 0.
+        """
+        until_tick = self.last_tick if until_tick is None else until_tick
+
+        sim = new_simulation(self.fixed_point, match_seconds=self.match_seconds, seed=self.seed)
+        i = bisect.bisect_right(self._keyframe_ticks, until_tick) - 1
+        if use_keyframes and i >= 0:
+            sim.set_state(self.keyframes[i][1])
+
+        while sim.tick < until_tick and not sim.finished:
+            sim.step(self.inputs_at(sim.tick + 1))
+        return sim
+
+
+#region Client replays
+class ClientReplayWriter:
+    """Records an offline game's seed and per-tick key state; the client saves it when the match ends."""
+
+    def __init__(self, seed: int, match_seconds: int, tick_rate: float, scale: float):
+        self.seed = seed
+        self._buffer = bytearray(CLIENT_MAGIC)
+        self._last_keys = None
+        self._record(CLIENT_HEADER.pack(KIND_HEADER, seed, match_seconds, tick_rate, scale))
+
+    def _record(self, payload: bytes):
+        self._buffer += LENGTH.pack(len(payload))
+        self._buffer += payload
+
+    def keys(self, tick: int, pressed: tuple):
+        """`pressed` = the key codes held this tick."""
+        if pressed != self._last_keys:
+            self._last_keys = pressed
+            self._record(KEYS.pack(KIND_INPUT, tick) + b"".join(KEY_CODE.pack(k) for k in pressed))
+
+    def end(self, tick: int, scores):
+        self._record(END.pack(KIND_END, tick, *scores[:2]))
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self._buffer)
+
+
+class ClientReplay:
+    def __init__(self, path):
+        self.seed = 0
+        self.match_seconds = 0
+        self.tick_rate = 60
+        self.scale = 1
+        self.end = None # (tick, scores)
+        self._ticks: list[int] = []
+        self._keys: list[frozenset] = []
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        for payload in read_records(data, CLIENT_MAGIC, path):
+            match payload[0]:
+                case 0: # KIND_HEADER
+                    _, self.seed, self.match_seconds, self.tick_rate, self.scale = CLIENT_HEADER.unpack(payload)
+                case 1: # KIND_INPUT
+                    _, tick = KEYS.unpack_from(payload)
+                    codes = payload[KEYS.size:]
+                    self._ticks.append(tick)
+                    self._keys.append(frozenset(code for (code,) in KEY_CODE.iter_unpack(codes)))
+                case 3: # KIND_END
+                    _, tick, *scores = END.unpack(payload)
+                    self.end = (tick, scores)
+
+    @property
+    def last_tick(self) -> int:
+        if self.end:
+            return self.end[0]
+        return self._ticks[-1] if self._ticks else 0
+
+    def keys_at(self, tick: int) -> frozenset:
+        i = bisect.bisect_right(self._ticks, tick) - 1
+        return self._keys[i] if i >= 0 else frozenset()
+
+
+#region Playback tool
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate a recorded server match.")
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, default=None, help="stop at this tick (uses the nearest keyframe)")
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.path)
+    print(f"replay : {replay.name} : seed {replay.seed}{' (fixed point)' if replay.fixed_point else ''} : {len(replay.inputs)} input changes, "
+          f"{len(replay.keyframes)} keyframes, {replay.last_tick} ticks")
+
+    # seeking jumps to a keyframe, a full run replays every tick to check for desyncs
+    start = time.perf_counter()
+    sim = replay.simulate(args.seek, use_keyframes=args.seek is not None)
+    elapsed = time.perf_counter() - start
+
+    real_s = sim.tick / replay.tick_rate
+    speedup = real_s / elapsed if elapsed else float("inf")
+    print(f"replay : tick {sim.tick} : {sim.snapshot()} : state {sim.state_hash():08x}")
+    print(f"replay : simulated in {elapsed * 1000:.1f}ms ({speedup:.0f}x real time)")
+
+    # A full replay should land exactly where the server did
+    if args.seek is None and replay.end:
+        end_tick, scores, reason = replay.end
+        ok = sim.tick == end_tick and sim.scores == scores
+        print(f"replay : ended '{reason}' with {scores} : {'MATCH' if ok else 'DESYNC'}")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
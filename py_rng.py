@@ -0,0 +1,30 @@
+# py_rng.py - the one place games draw random numbers from
+# Anything that should replay bit-exact (offline games, replays, simulations) must use a GameRNG
+# instead of the global `random` module, so a seed + the inputs reproduce the whole run.
+
+import random
+
+
+class GameRNG(random.Random):
+    """random.Random that remembers its seed and can be snapshotted / restored mid-game."""
+
+    def __init__(self, seed=None):
+        self.seed_value = None
+        super().__init__(seed)
+
+    def seed(self, a=None, version=2):
+        # random.Random.__init__ calls this too
+        if a is None:
+            a = random.getrandbits(32)
+        self.seed_value = a
+        super().seed(a, version)
+
+    def snapshot(self):
+        return self.getstate()
+
+    def restore(self, state):
+        self.setstate(state)
+
+
+# Shared by the client and its sprites; reseeded at the start of every game
+rng = GameRNG()
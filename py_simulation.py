@@ -0,0 +1,261 @@
+# py_simulation.py - headless classic pong match, shared by the server rooms and the client
+# No pygame in here: the server imports this, and it must run without a display.
+# Units are native (unscaled) pixels, mirroring the classic.stage layout and py_sprites' Ball/Player.
+# FixedPongSimulation runs the same rules in integer 1/256 px subpixels (see the bottom of the file).
+
+import zlib
+
+from math import isqrt
+
+# Field (mirrors Config.RES_X_INIT / RES_Y_INIT / CELL_SIZE)
+FIELD_W, FIELD_H = 280, 184
+CELL_SIZE = 8
+
+# Spawn points (classic.stage grid, shifted by the stager's one tile buffer)
+PADDLE_X = (24, 248)
+PADDLE_Y = 80
+BALL_SPAWN = (136, 80)
+
+# Movement (mirrors py_sprites)
+PADDLE_SPEED = 2
+PADDLE_MOTION_SAMPLE_TICKS = 10
+BALL_BASE_SPEED = 1
+BALL_MAX_SPEED = 4.0
+BALL_SPEED_INCREMENT = 0.15
+BALL_MAX_INFLUENCE = .5
+EDGE_BUFFER_TICKS = 5
+
+# Match rules (mirrors updateOfflineGame)
+TICK_RATE = 60
+GOAL_HALT_TICKS = 180
+GOALS_TO_WIN = 3
+MATCH_SECONDS = 60
+
+
+# Fixed point: positions, velocities and speeds are ints in 1/256 of a native pixel
+FIXED_SHIFT = 8
+FIXED_ONE = 1 << FIXED_SHIFT
+
+
+class PongSimulation:
+    """
+    One 1v1 match. Feed it one input per paddle per tick via step():
+      -1 = up, 0 = idle, 1 = down
+    Paddle 0 is on the left, paddle 1 on the right.
+    """
+    # Position units per native pixel
+    UNIT = 1
+    fixed_point = False
+
+    def __init__(self, match_seconds=MATCH_SECONDS, seed=0):
+        self.seed = seed # recorded in replays alongside the inputs
+        self.match_seconds = match_seconds
+
+        # Constants in this simulation's units
+        u = self._units
+        self._field_w, self._field_h, self._cell = u(FIELD_W), u(FIELD_H), u(CELL_SIZE)
+        self._paddle_x = tuple(u(x) for x in PADDLE_X)
+        self._paddle_spawn_y = u(PADDLE_Y)
+        self._ball_spawn = (u(BALL_SPAWN[0]), u(BALL_SPAWN[1]))
+        self._paddle_speed = u(PADDLE_SPEED)
+        self._ball_base_speed = u(BALL_BASE_SPEED)
+        self._ball_max_speed = u(BALL_MAX_SPEED)
+        self._ball_speed_increment = u(BALL_SPEED_INCREMENT)
+        self._ball_max_influence = u(BALL_MAX_INFLUENCE)
+
+        self.tick = 0
+        self.ticks_left = match_seconds * TICK_RATE
+        self.scores = [0, 0]
+        self.halt = 0
+        self.finished = False
+
+        self.paddle_y = [self._paddle_spawn_y] * 2
+        self.paddle_y_prev = [self._paddle_spawn_y] * 2
+
+        self.ball_x, self.ball_y = self._ball_spawn
+        self.ball_vx, self.ball_vy = -self._ball_base_speed, 0
+        self.ball_speed = self._ball_base_speed
+        self.ball_owner = None
+        self.edge_buffer = 0
+
+    #region Step
+    def step(self, inputs) -> list[str]:
+        """Advance one tick. Returns the events that happened (for sounds etc.)."""
+        events = []
+        if self.finished:
+            return events
+
+        self.tick += 1
+
+        # --- Halt frames (after a goal) ---
+        if self.halt > 0:
+            self.halt -= 1
+            if self.halt == 0:
+                self._respawn()
+            return events
+
+        # --- Clock ---
+        self.ticks_left -= 1
+        if self.ticks_left <= 0:
+            self.finished = True
+            events.append("time_up")
+            return events
+
+        # --- Paddles ---
+        for i, direction in enumerate(inputs):
+            self._move_paddle(i, direction)
+
+        # --- Ball ---
+        if self.edge_buffer > 0:
+            self.edge_buffer -= 1
+
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        # -- Ball v. Paddles
+        for i in (0, 1):
+            if self._overlaps_paddle(i) and self.ball_owner != i:
+                self.ball_owner = i
+                self._bounce_off_paddle(i)
+                events.append("bonk")
+
+        # -- Ball v. Goals
+        if self.ball_x < 0:
+            self._score(1)
+            events.append("goal")
+        elif self.ball_x + self._cell > self._field_w:
+            self._score(0)
+            events.append("goal")
+
+        # -- Ball v. Walls
+        if self.edge_buffer <= 0 and (self.ball_y <= 0 or self.ball_y + self._cell >= self._field_h):
+            self.edge_buffer = EDGE_BUFFER_TICKS
+            self._set_ball_velocity(self.ball_vx, -self.ball_vy)
+            events.append("wall")
+
+        if GOALS_TO_WIN in self.scores:
+            self.finished = True
+            events.append("game_over")
+
+        return events
+
+    #region Helpers
+    def _units(self, value):
+        """A native pixel constant in this simulation's units."""
+        return value
+
+    def _move_paddle(self, i, direction):
+        if direction:
+            new_y = self.paddle_y[i] + self._paddle_speed * (1 if direction > 0 else -1)
+            # same bounds as Player.task
+            if 0 < new_y < self._field_h - self._cell:
+                self.paddle_y[i] = new_y
+
+        if self.tick % PADDLE_MOTION_SAMPLE_TICKS == 0:
+            self.paddle_y_prev[i] = self.paddle_y[i]
+
+    def _overlaps_paddle(self, i):
+        px, py, cell = self._paddle_x[i], self.paddle_y[i], self._cell
+        return (
+            self.ball_x < px + cell and px < self.ball_x + cell and
+            self.ball_y < py + cell and py < self.ball_y + cell
+        )
+
+    def _bounce_off_paddle(self, i):
+        # same as Ball.set_velocity_basedOnPlayerMotion
+        delta = self.paddle_y[i] - self.paddle_y_prev[i]
+        delta = max(-self._ball_max_influence, min(self._ball_max_influence, delta))
+        self.ball_speed = min(self.ball_speed + self._ball_speed_increment, self._ball_max_speed)
+        self._set_ball_velocity(-self.ball_vx, self.ball_vy + delta)
+
+    def _set_ball_velocity(self, vx, vy):
+        mag = (vx ** 2 + vy ** 2) ** 0.5
+        if mag != 0:
+            vx, vy = (vx / mag) * self.ball_speed, (vy / mag) * self.ball_speed
+        self.ball_vx, self.ball_vy = vx, vy
+
+    def _score(self, scorer):
+        self.scores[scorer] += 1
+        self.halt = GOAL_HALT_TICKS
+        # serve toward the player who conceded
+        self._set_ball_velocity(-1 if scorer == 1 else 1, 0)
+
+    def _respawn(self):
+        self.ball_x, self.ball_y = self._ball_spawn
+        self.ball_owner = None
+        self.paddle_y = [self._paddle_spawn_y] * 2
+        self.paddle_y_prev = [self._paddle_spawn_y] * 2
+
+    #region Snapshot
+    def snapshot(self) -> dict:
+        """Compact, JSON friendly view of the match for the network."""
+        return {
+            "tick": self.tick,
+            "ball": [round(self.ball_x / self.UNIT), round(self.ball_y / self.UNIT)],
+            "paddles": [y // self.UNIT for y in self.paddle_y],
+            "scores": list(self.scores),
+            "clock": self.ticks_left // TICK_RATE,
+            "halt": self.halt > 0,
+        }
+
+    #region State
+    def get_state(self) -> tuple:
+        """Everything step() depends on, flat, for replay keyframes."""
+        return (
+            self.tick, self.ticks_left, *self.scores, self.halt, self.finished,
+            *self.paddle_y, *self.paddle_y_prev,
+            self.ball_x, self.ball_y, self.ball_vx, self.ball_vy, self.ball_speed,
+            -1 if self.ball_owner is None else self.ball_owner,
+            self.edge_buffer,
+        )
+
+    def set_state(self, state):
+        (
+            self.tick, self.ticks_left, score_0, score_1, self.halt, self.finished,
+            paddle_0, paddle_1, paddle_prev_0, paddle_prev_1,
+            self.ball_x, self.ball_y, self.ball_vx, self.ball_vy, self.ball_speed,
+            owner, self.edge_buffer,
+        ) = state
+        self.scores = [score_0, score_1]
+        self.paddle_y = [paddle_0, paddle_1]
+        self.paddle_y_prev = [paddle_prev_0, paddle_prev_1]
+        self.ball_owner = None if owner < 0 else owner
+
+    def state_hash(self) -> int:
+        """Stable across processes and machines (unlike hash()), for comparing simulations."""
+        # as floats, so 1 and 1.0 (e.g. after a keyframe restore) hash the same
+        return zlib.crc32(repr(tuple(float(v) for v in self.get_state())).encode())
+
+
+#region Fixed point
+def _div(a, b):
+    """Integer division rounding toward zero, so +/- velocities stay mirror images."""
+    return a // b if (a >= 0) == (b >= 0) else -(-a // b)
+
+
+class FixedPongSimulation(PongSimulation):
+    """
+    Same rules as PongSimulation, but every position, velocity and speed is an int in
+    1/256 px (no floats, no `** 0.5`), so any machine running the same inputs lands on
+    bit-identical state.
+    """
+    UNIT = FIXED_ONE
+    fixed_point = True
+
+    def _units(self, value):
+        return round(value * FIXED_ONE)
+
+    def _set_ball_velocity(self, vx, vy):
+        mag = isqrt(vx * vx + vy * vy)
+        if mag != 0:
+            vx, vy = _div(vx * self.ball_speed, mag), _div(vy * self.ball_speed, mag)
+        self.ball_vx, self.ball_vy = vx, vy
+
+    def set_state(self, state):
+        # keyframes may hand back whole numbers as floats
+        super().set_state(tuple(int(v) for v in state))
+        self.finished = bool(self.finished)
+
+
+def new_simulation(fixed_point=False, **kwargs) -> PongSimulation:
+    return (FixedPongSimulation if fixed_point else PongSimulation)(**kwargs)
@@ -3,19 +3,32 @@ from py_resource import resource_path
 
 
 class SoundMixer:
-    def __init__(self, frequency=44100, size=-16, channels=2, buffer=512):
+    def __init__(self, frequency=44100, size=-16, channels=2, buffer=512, enabled=True):
         self._initialized = False
+        self._init_attempted = False
         self.sounds = {}   # (name, path) -> Sound
         self._channels = {}  # (name, path) -> Channel
         self._music = None  # (name, path) -> currently loaded music track
         self._paused = set()
 
-        try:
+        # disabled = a silent sink that never touches the audio device (extra worlds, headless runs)
+        self.enabled = enabled
+        if enabled:
+            # only records the settings (pygame.init() opens the mixer with them), no device yet
             pygame.mixer.pre_init(frequency, size, channels, buffer)
+
+    def _ensure_initialized(self):
+        # The device is opened on the first play, not at import, so headless runs never touch it
+        if self._init_attempted or not self.enabled:
+            return self._initialized
+        self._init_attempted = True
+
+        try:
             pygame.mixer.init()
             self._initialized = True
         except Exception as e:
             print(f"[SoundMixer] Failed to initialize mixer: {e}")
+        return self._initialized
 
     def _load_sound(self, name: str, relative_path: str):
         path = resource_path(relative_path)
@@ -53,7 +66,7 @@ class SoundMixer:
         Use loops=-1 for indefinite looping. That is routed through
         pygame.mixer.music so long-form music behaves correctly.
         """
-        if not self._initialized:
+        if not self._ensure_initialized():
             return
 
         # Long-running infinite loops are more reliable through pygame.mixer.music.
@@ -130,6 +143,8 @@ class SoundMixer:
                 self._channels.pop(key, None)
 
     def stop_all(self):
+        if not self._initialized:
+            return
         pygame.mixer.music.stop()
         pygame.mixer.stop()
         self._channels.clear()
@@ -137,6 +152,8 @@ class SoundMixer:
         self._music = None
 
     def quit(self):
+        if not self._initialized:
+            return
         pygame.mixer.quit()
         self._initialized = False
 
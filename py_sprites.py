@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-import pygame, time, random
+import pygame, time
 
-from random import randint
 
 from py_resource import resource_path
-from py_render import loadSprite, scaleSprite, grid_to_pixel, pixel_to_grid
-from py_config import config
-from py_input import inputManager
+from py_render import grid_to_pixel, pixel_to_grid, surfaceCache
+from py_rng import GameRNG
+from py_world import World, current_world
 
 # Directories
 sprites_dir = resource_path("sprites")
@@ -18,6 +17,9 @@ paddle_dir = sprites_dir / "paddle"
 class Sprite:
     #region __Init__
     def __init__(self):
+        # Config, rng, input and audio come from the world active at construction (see py_world)
+        self.world: World = current_world()
+
         # (Float) Pixel coords
         self.pos_x, self.pos_y, self.pos_x_previous, self.pos_y_previous = 0, 0, 0, 0
         self.pos_row, self.pos_col = 0,0
@@ -57,35 +59,24 @@ class Sprite:
         self.surface_tinted_original: pygame.Surface | None = None
         self.surface_render: pygame.Surface | None = None
         self.surface_tint_colour: tuple[int,int,int] | None = None
+        # the frame currently shown; all three surfaces are shared copies from py_render.surfaceCache
+        self.surface_path = None
 
         assert self.__SCALE >= 0.25, "resolution_scale must be greater than 0.25"
 
     #region Surfacing
-    def _tint_surface(self, surface: pygame.Surface, colour: tuple[int,int,int]) -> pygame.Surface:
-        """Return a new Surface that is the multiplicative tint of `surface` by `colour`.
-        Uses BLEND_RGBA_MULT to preserve alpha while multiplying RGB channels.
-        """
-        if surface is None:
-            return None
-        tinted = surface.copy().convert_alpha()
-        tint_surf = pygame.Surface(tinted.get_size(), pygame.SRCALPHA)
-        # ensure full-alpha overlay with the chosen colour
-        tint_surf.fill((*colour, 255))
-        tinted.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        return tinted
-
-    def _build_render_surface(self, source_surface: pygame.Surface) -> pygame.Surface:
-        """Scale `source_surface` according to the global config and per-sprite `self.__SCALE`.
-        Returns a new Surface suitable for blitting.
-        """
-        if source_surface is None:
-            return None
-        final_factor = config.resolution_scale * self.__SCALE
-        # print(final_factor, config.resolution_scale, self.__SCALE)
-        if final_factor > 1024:
-            pass
-        return scaleSprite(self, source_surface, factor=final_factor, smooth=False)
-    
+    def _refresh_surfaces(self):
+        """Point the surfaces at the cached load / tint / scale of `surface_path` (no per-sprite copies)."""
+        if self.surface_path is None:
+            return
+        tint = self.surface_tint_colour
+        self.surface_original = surfaceCache.get(self.surface_path)
+        self.surface_tinted_original = surfaceCache.get(self.surface_path, tint) if tint is not None else None
+        self.surface_render = surfaceCache.get(self.surface_path, tint, self.world.config.resolution_scale * self.__SCALE)
+
+        if self.sprite_rect and self.surface_render:
+            self.sprite_rect.size = self.surface_render.get_size()
+
     def rebuild_surfaces(self, tint: tuple[int, int, int] | None = None):
         """
         Rebuilds all surfaces:
@@ -100,24 +91,8 @@ class Sprite:
         if tint is not None:
             self.surface_tint_colour = tint
 
-        # Choose source: original or tint-original
-        if self.surface_tint_colour is not None:
-            # Build tinted original
-            self.surface_tinted_original = self._tint_surface(
-                self.surface_original,
-                self.surface_tint_colour
-            )
-            source = self.surface_tinted_original
-        else:
-            self.surface_tinted_original = None
-            source = self.surface_original
-
-        # Now build the scaled render surface
-        self.surface_render = self._build_render_surface(source)
-
-        # Update rect
-        if self.sprite_rect and self.surface_render:
-            self.sprite_rect.size = self.surface_render.get_size()
+        # Tinted original + scaled render surface, both from the cache
+        self._refresh_surfaces()
 
     ####
 
@@ -147,8 +122,8 @@ class Sprite:
 
         # --- OFFSET RESOLUTION ---
         # If offsets are provided, use them; otherwise fall back to the object's defaults
-        ox = offset_x*config.resolution_scale if offset_x is not None else self.POS_X_OFFSET
-        oy = offset_y*config.resolution_scale if offset_y is not None else self.POS_Y_OFFSET
+        ox = offset_x*self.world.config.resolution_scale if offset_x is not None else self.POS_X_OFFSET
+        oy = offset_y*self.world.config.resolution_scale if offset_y is not None else self.POS_Y_OFFSET
 
         # --- INPUT RESOLUTION ---
         # Allow EITHER grid coords (row/col) OR pixel coords (pos_x/pos_y)
@@ -158,23 +133,24 @@ class Sprite:
             self.pos_y = (target_pos_y if target_pos_y is not None else 0) + oy
 
             # Convert pixel → grid (keeps your original behaviour)
-            coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y))
+            coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y), config=self.world.config)
             self.pos_row, self.pos_col = coord_grid["row"], coord_grid["col"]
 
         else:
             # Grid‑based spawn (your original behaviour)
-            coord_pixel = grid_to_pixel(row=target_row, col=target_col)
+            coord_pixel = grid_to_pixel(row=target_row, col=target_col, config=self.world.config)
             self.pos_x = coord_pixel["x"] + ox
             self.pos_y = coord_pixel["y"] + oy
 
             # From coord_pixel + offsets, translate into pixelspace | LOSES ACCURACY WITH OFFSET
-            coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y))
+            coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y), config=self.world.config)
             self.pos_row, self.pos_col = coord_grid["row"], coord_grid["col"]
         
         # Update empty spawn constants
-        coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y))
+        coord_grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y), config=self.world.config)
         self.SUMMONED_POS_X, self.SUMMONED_POS_Y = self.pos_x, self.pos_y
         self.SUMMONED_POS_ROW, self.SUMMONED_POS_COL = coord_grid["row"], coord_grid["col"]
+        self.settle_position()
 
         # If a colour was passed, stash it (so future animations/rescales reuse it)
         if colour is not None:
@@ -191,12 +167,8 @@ class Sprite:
         except Exception:
             # fallback if spritesheet not available
             if self.spritesheet and self.spritesheet[0]:
-                raw = loadSprite([self.spritesheet[0][initial_sprite_index]])
-                self.surface_original = raw.convert_alpha()
-                if self.surface_tint_colour is not None:
-                    self.surface_tinted_original = self._tint_surface(self.surface_original, self.surface_tint_colour)
-                source = self.surface_tinted_original if self.surface_tinted_original else self.surface_original
-                self.surface_render = self._build_render_surface(source)
+                self.surface_path = self.spritesheet[0][initial_sprite_index]
+                self._refresh_surfaces()
 
         if self.surface_render:
             self.sprite_rect = self.surface_render.get_rect(topleft=(self.pos_x, self.pos_y))
@@ -216,8 +188,8 @@ class Sprite:
          - compute the pixel-space ratio and update positions
          - rebuild the render surface from the ORIGINAL (unscaled) bitmaps so we never compound
         """
-        new_scale = config.resolution_scale
-        old_scale = config.last_resolution_scale
+        new_scale = self.world.config.resolution_scale
+        old_scale = self.world.config.last_resolution_scale
 
         if new_scale == old_scale:
             return
@@ -228,31 +200,34 @@ class Sprite:
         scale_ratio = new_scale / old_scale
 
         # Update config tracking
-        config.last_resolution_scale = new_scale
+        self.world.config.last_resolution_scale = new_scale
 
         # Update pixel positions based on ratio
         self.pos_x = int(self.pos_x * scale_ratio)
         self.pos_y = int(self.pos_y * scale_ratio)
+        self.settle_position()
 
         # Update grid coords using your existing logic
-        coord_grid = pixel_to_grid(int(self.pos_x), int(self.pos_y))
+        coord_grid = pixel_to_grid(int(self.pos_x), int(self.pos_y), config=self.world.config)
         self.pos_col = coord_grid["col"]
         self.pos_row = coord_grid["row"]
 
-        # Scale surface from ORIGINAL source (tinted-original preferred)
-        source_surface = self.surface_tinted_original if self.surface_tinted_original else self.surface_original
-        if source_surface is not None:
-            self.surface_render = self._build_render_surface(source_surface)
+        # Scaled surface for the new scale (built from the cached ORIGINAL, never compounded)
+        self._refresh_surfaces()
 
         # Update rect
         if self.sprite_rect and self.surface_render:
-            self.sprite_rect.size = self.surface_render.get_size()
             self.sprite_rect.topleft = (self.pos_x, self.pos_y)
         
         # return new_scale
 
     #region draw
-    def draw(self, screen):
+    def settle_position(self):
+        """Interpolated draws start from here: called before every tick, and on teleports."""
+        self.pos_x_previous, self.pos_y_previous = self.pos_x, self.pos_y
+
+    def draw(self, screen, alpha=1.0):
+        """`alpha`: how far between the previous tick's position and this one to draw (fixed timestep)."""
         if not self.surface_render:
             return
         
@@ -268,14 +243,20 @@ class Sprite:
         # else:
         #     return
 
-        # (Integer) Grids
-        coord_grid = pixel_to_grid(int(self.pos_x),int(self.pos_y))
-        self.pos_col = coord_grid["col"]
-        self.pos_row = coord_grid["row"]
-        if self.sprite_rect:
-            self.sprite_rect.topleft = (self.pos_x, self.pos_y)
+        screen.blit(self.surface_render, self.draw_rect(alpha))
 
-        screen.blit(self.surface_render, (self.pos_x, self.pos_y))
+    def draw_rect(self, alpha=1.0) -> pygame.Rect:
+        """
+        Where draw() puts the sprite this frame (py_render's render lists are built from these). Needs surface_render.
+        Pure: pos_row / pos_col and sprite_rect are kept up to date by summon / move_position / rescale.
+        """
+        if alpha < 1.0:
+            x = self.pos_x_previous + (self.pos_x - self.pos_x_previous) * alpha
+            y = self.pos_y_previous + (self.pos_y - self.pos_y_previous) * alpha
+        else:
+            x, y = self.pos_x, self.pos_y
+        # pygame.Rect truncates floats the same way blit does
+        return pygame.Rect(x, y, *self.surface_render.get_size())
     
 
     #region Spritesheet
@@ -288,30 +269,16 @@ class Sprite:
     
     def set_sprite(self, anim_index: int, frame_index: int, recolour: tuple[int,int,int] | None = None):
         """
-        Load frame from disk into surface_original, optionally recolour it and cache the tinted original.
+        Load frame (via surfaceCache, so disk only the first time) into surface_original, optionally recolour it.
         Then scale and set surface_render (the one surface used for drawing).
         """
         # Update tint colour if recolour explicitly provided
         if recolour is not None:
             self.surface_tint_colour = tuple(recolour)
 
-        # Load raw frame
-        raw = loadSprite([self.spritesheet[anim_index][frame_index]])
-        self.surface_original = raw.convert_alpha()
-
-        # If a tint colour exists, produce a tinted original; else clear it
-        if self.surface_tint_colour is not None:
-            self.surface_tinted_original = self._tint_surface(self.surface_original, self.surface_tint_colour)
-            source = self.surface_tinted_original
-        else:
-            self.surface_tinted_original = None
-            source = self.surface_original
-
-        # Scale to current global * per-sprite scale
-        self.surface_render = self._build_render_surface(source)
-
-        if self.sprite_rect and self.surface_render:
-            self.sprite_rect.size = self.surface_render.get_size()
+        # Frame (tinted and scaled to current global * per-sprite scale) from the surface cache
+        self.surface_path = self.spritesheet[anim_index][frame_index]
+        self._refresh_surfaces()
 
     def oscillate_sprite(self, oscillator_override: int | None = None):
         """
@@ -326,37 +293,27 @@ class Sprite:
 
         anim_index = 0
         frame_index = self._sprite_oscillator
-        # Load new base frame and apply current tint (if any)
-        raw = loadSprite([self.spritesheet[anim_index][frame_index]])
-        self.surface_original = raw.convert_alpha()
-
-        # Reapply tint cache if we have tint_colour
-        if self.surface_tint_colour is not None:
-            self.surface_tinted_original = self._tint_surface(self.surface_original, self.surface_tint_colour)
-            source = self.surface_tinted_original
-        else:
-            self.surface_tinted_original = None
-            source = self.surface_original
-
-        self.surface_render = self._build_render_surface(source)
-        if self.sprite_rect and self.surface_render:
-            self.sprite_rect.size = self.surface_render.get_size()
+        # New frame, current tint (if any); a cache hit after the first time round
+        self.surface_path = self.spritesheet[anim_index][frame_index]
+        self._refresh_surfaces()
 
     #region Positioning
-    def move_position(self, dx=0, dy=0, drow=0, dcol=0, set_position=False):
+    def move_position(self, dx=0, dy=0, drow=0, dcol=0, set_position=False, interpolate=False):
 
         # Convert row/col movement to pixel movement (unscaled)
-        cell = config.CELL_SIZE
+        cell = self.world.config.CELL_SIZE
         if drow or dcol:
             dx, dy = dcol * cell, drow * cell
 
         # __SCALE MOVEMENT TO MATCH RENDER __SCALE
-        scale = config.resolution_scale
+        scale = self.world.config.resolution_scale
         
         if set_position:
-            # DIRECTLY SET POSITION (resolution_scale already applied)
+            # DIRECTLY SET POSITION (resolution_scale already applied), a jump unless told otherwise
             self.pos_x = dx
             self.pos_y = dy
+            if not interpolate:
+                self.settle_position()
         else:
             # APPLY SCALING BASED ON RESOLUTION
             dx *= scale
@@ -366,15 +323,25 @@ class Sprite:
             self.pos_y += dy
 
         # Update grid coords
-        grid = pixel_to_grid(x=self.pos_x, y=self.pos_y)
+        grid = pixel_to_grid(x=int(self.pos_x), y=int(self.pos_y), config=self.world.config)
         self.pos_row, self.pos_col = grid["row"], grid["col"]
 
         if self.sprite_rect:
             self.sprite_rect.topleft = (self.pos_x, self.pos_y)
 
+    def set_native_position(self, x, y):
+        """Place the sprite from native (unscaled) pixel coords, e.g. a server snapshot (one tick on, so interpolated)."""
+        scale = self.world.config.resolution_scale
+        self.move_position(dx=x * scale, dy=y * scale, set_position=True, interpolate=True)
+
 
 
     
+    @property
+    def rng(self) -> GameRNG:
+        # the world's, so one seed replays every sprite's randomness too
+        return self.world.rng
+
     #region Tasking
     def ticker(self):
         self.tick += 1
@@ -382,11 +349,12 @@ class Sprite:
     def _task_demo(self):
         match self.__class__.__name__:
             case _:
-                if self.tick % 10+randint(-3,3) == 0:
+                if self.tick % 10+self.rng.randint(-3,3) == 0:
                     self.oscillate_sprite()
                     self.move_position(dx=self._demo_x,dy=0)
     
     def query_isOffscreen(self):
+        config = self.world.config
         return self.pos_col > config.MAX_COL or self.pos_col < 1 or self.pos_row > config.MAX_ROW or self.pos_row < -1
 
     def task(self):
@@ -465,7 +433,7 @@ class Speaker(Sprite):
     
     def sync_sprite_with_volume(self):
         # volume_multiplier is between 0 and 1
-        vol = config.volume_multiplier
+        vol = self.world.config.volume_multiplier
 
         # Map 0–1 range to 0–4 sprite index
         # Multiply by number of sprites, subtract 1 because index starts at 0
@@ -521,7 +489,7 @@ class Particle(Sprite):
     def __init__(self):
         super().__init__()
         self.spritesheet = [[sprites_dir / "missing.png"]]
-        self.lifetime = 3 * config.frame_rate  # frames
+        self.lifetime = 3 * self.world.config.tick_rate  # ticks
     
     def decay(self):
         self.lifetime -= 1
@@ -534,21 +502,21 @@ class Confetti(Particle):
         super().__init__()
         self.team = "particles"
 
-        variation = randint(1,2)
+        variation = self.rng.randint(1,2)
         self.spritesheet = [[sprites_dir / "particle" / f"confetti{variation}.png"]]
 
         # Random offset
-        self.POS_X_OFFSET = randint(-4, 4)
-        self.POS_Y_OFFSET = randint(-4, 4)
+        self.POS_X_OFFSET = self.rng.randint(-4, 4)
+        self.POS_Y_OFFSET = self.rng.randint(-4, 4)
 
         # Fall origin
         self._fall_origin_x = self.pos_x
         self._fall_origin_y = self.pos_y
 
         # Dominant Colour
-        white_dominant = (randint(0,2) == 1)
-        colour_values = [255, randint(50, 100), randint(50, 100)] if not white_dominant else [255,255,255]
-        random.shuffle(colour_values)
+        white_dominant = (self.rng.randint(0,2) == 1)
+        colour_values = [255, self.rng.randint(50, 100), self.rng.randint(50, 100)] if not white_dominant else [255,255,255]
+        self.rng.shuffle(colour_values)
         self.set_sprite(0, 0, recolour=tuple(colour_values))
         
         self._position_initialized = False
@@ -556,8 +524,8 @@ class Confetti(Particle):
     def task(self, game_ball_last_position):
         
         # Random horizontal drift velocity (splatter effect)
-        self.drift_x = randint(-1, 1)
-        self.drift_y = randint(1, 2)  # always falls down
+        self.drift_x = self.rng.randint(-1, 1)
+        self.drift_y = self.rng.randint(1, 2)  # always falls down
 
         # Set position once from game_ball_last_position
         if not self._position_initialized:
@@ -610,12 +578,13 @@ class Player(Dummy):
         has_inputted = False
         applied_speed = self.speed
         is_y_upOOB = not (self.pos_y-applied_speed > 0)
+        config = self.world.config
         is_y_downOOB = not ((self.pos_y+applied_speed) < config.res_y-(config.CELL_SIZE*config.resolution_scale))
 
-        if inputManager.get_action(self.movement_orientation["forward"], keys) and not is_y_upOOB:
+        if self.world.input.get_action(self.movement_orientation["forward"], keys) and not is_y_upOOB:
             # has_inputted = True
             self.move_position(dy=-applied_speed)
-        if inputManager.get_action(self.movement_orientation["backward"], keys) and not is_y_downOOB:
+        if self.world.input.get_action(self.movement_orientation["backward"], keys) and not is_y_downOOB:
             # has_inputted = True
             self.move_position(dy=applied_speed)
         
@@ -631,6 +600,15 @@ class Player(Dummy):
             pass
 
 
+#region OnlinePlayer
+class OnlinePlayer(Dummy):
+    """A paddle driven by the server's room_state snapshots rather than local input."""
+    def __init__(self):
+        super().__init__()
+        self.team = "players"
+        self.client = False
+
+
 #region CPUPlayer
 class CPUPlayer(Dummy):
     def __init__(self):
@@ -663,6 +641,7 @@ class CPUPlayer(Dummy):
 
         # Clamp delta so we don't move out of bounds
         top_limit = 0
+        config = self.world.config
         bottom_limit = config.res_y - (config.CELL_SIZE * config.resolution_scale)
 
         # If applying dy would go out of bounds, cancel it
@@ -678,10 +657,10 @@ class CPUPlayer(Dummy):
             self.pos_y_prev = self.pos_y
     
     def _do_task_demo(self, ball):
-        if self.tick or randint(0,2) == 1:
-            self.speed = randint(self.SPEED_INITIAL,self.SPEED_INITIAL+3)
+        if self.tick or self.rng.randint(0,2) == 1:
+            self.speed = self.rng.randint(self.SPEED_INITIAL,self.SPEED_INITIAL+3)
         
-        if randint(0,1) == 0:
+        if self.rng.randint(0,1) == 0:
             self.task(ball, skip_approaching=True)
         
 
@@ -768,9 +747,9 @@ class Ball(Sprite):
     
     def redirect_if_on_edge(self, soundMixer, soundVolumeOverride=1):
         if self.edge_collision_buffer_ignore <= 0:
-            if (self.sprite_rect.top <= 0 or self.sprite_rect.bottom >= config.res_y):
+            if (self.sprite_rect.top <= 0 or self.sprite_rect.bottom >= self.world.config.res_y):
                 self.edge_collision_buffer_ignore = 5
-                soundMixer.play("initial_velocity", f"audio/initial_velocity.ogg",vol_mult=config.volume_multiplier*soundVolumeOverride)
+                soundMixer.play("initial_velocity", f"audio/initial_velocity.ogg",vol_mult=self.world.config.volume_multiplier*soundVolumeOverride)
                 self.set_velocity(self.velocity_x, -self.velocity_y)
     
     def respawn(self):
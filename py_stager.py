@@ -1,11 +1,12 @@
 import py_sprites
-from py_config import config
+from py_world import World, current_world
 
 TILE_BUFFER_OFFSET = 1
 
 class Stager:
-    def __init__(self, screen, reference_entity_dict):
+    def __init__(self, screen, reference_entity_dict, world: World | None = None):
         self.screen = screen
+        self.world = world if world is not None else current_world()
         self.entities = reference_entity_dict
         self.reset()
 
@@ -59,6 +60,7 @@ class Stager:
         return self.entities
 
     def _spawn(self):
+        config = self.world.config
         offset = ( TILE_BUFFER_OFFSET * -config.CELL_SIZE ) * config.resolution_scale
 
         for row_i, row in enumerate(self.grid):
@@ -72,7 +74,8 @@ class Stager:
                 pos_y = (row_i * (config.CELL_SIZE * config.resolution_scale)) + offset
 
 
-                entity = cls()
+                with self.world.active():
+                    entity = cls()
                 entity.summon(
                     target_row=row_i,
                     target_col=col_i,
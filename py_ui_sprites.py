@@ -1,12 +1,16 @@
-import time, threading
+import time, threading, contextvars, queue
+import pygame
 
 import py_numpyStub as np
 
+from collections import OrderedDict
+from typing import NamedTuple
+
 from py_resource import resource_path
+from py_render import loadSprite, recolourSprite, scaleSprite, palettizeSprite, surfaceCache
 from py_sprites import Sprite
 from py_numpyStub import copy as np_copy
-from py_config import config
-from py_input import inputManager
+from py_world import current_world
 
 
 # Paths
@@ -17,27 +21,18 @@ fonts_dir = sprites_dir / "font"
 # Constants and lookup tables
 # -------------------------
 
-# Map special characters and digits to class names (used by translateIntoClass)
+# Map special characters to their glyph names in sprites/font (used by translateIntoGlyph);
+# everything else is looked up by its upper case self (A.png, 0.png, !.png ...)
 TRANSLATION_TABLE = {
-    "*": "Asterix",
-    "-": "Dash",
-    "_": "Under",
-    "=": "Equal",
-    "<": "Less",
-    ">": "Great",
-    "?": "Question",
+    "*": "asterix",
+    "-": "dash",
+    "_": "under",
+    "=": "equal",
+    "<": "less",
+    ">": "great",
+    "?": "question",
     ".": "Fullstop",
-    "/": "Slashfwd",
-    "0": "Zero",
-    "1": "One",
-    "2": "Two",
-    "3": "Three",
-    "4": "Four",
-    "5": "Five",
-    "6": "Six",
-    "7": "Seven",
-    "8": "Eight",
-    "9": "Nine",
+    "/": "slashfwd",
 }
 
 # Abbreviations for long literal keys used by the text renderer in keyboard mode
@@ -62,6 +57,11 @@ ABBREVIATION_TABLE = {
 # Special sentinel used to represent a real space cell in the grid
 REAL_SPACE = object()
 
+class Glyph(NamedTuple):
+    """One visible cell of the text grid: a FontAtlas name and its tint."""
+    name: str
+    colour: tuple[int, int, int] | None = None
+
 # Inline colour codes used in text strings
 NAMED_COLOURS = {
     "RED": (255, 0, 0),
@@ -83,6 +83,102 @@ colour_CODES = {
 }
 
 
+# -------------------------
+# Font atlas
+# -------------------------
+
+# Glyphs per atlas row
+FONT_ATLAS_COLUMNS = 16
+# What an unknown icon name draws as (the same fallback loadSprite uses)
+MISSING_GLYPH = "missing"
+
+class FontAtlas:
+    """
+    Every PNG in sprites/font packed into atlas pages, with a name -> (page, rect) table (name = file stem)
+    and a char -> name table. Built on first use from the palettized glyphs (surfaceCache, see PALETTE_SPRITE_DIRS):
+    page 0 holds those and stays 8-bit, so each tint of it is a palette swap on a copy; the glyphs that can't be
+    palettized (controller icons, soft edges) go on a 32-bit page 1 and get multiply-tinted instead.
+    Scaled / tinted pages are cached, so drawing text is only area blits out of a couple of surfaces.
+    """
+
+    def __init__(self, directory=fonts_dir):
+        self.directory = directory
+        self.rects: dict[str, tuple[int, pygame.Rect]] = {}
+        self.chars: dict[str, str] = {}
+        self._pages: list[pygame.Surface] | None = None
+        self._surfaces: dict[tuple, pygame.Surface] = {} # (page, tint, scale) -> atlas page
+        self._lock = threading.Lock() # render_text_background
+
+    def _build(self):
+        paths = sorted(p for p in self.directory.iterdir() if p.suffix.lower() == ".png")
+        images = {p.stem: surfaceCache.get(p) for p in paths}
+        missing = loadSprite([sprites_dir / "missing.png"])
+        images[MISSING_GLYPH] = palettizeSprite(missing) or missing
+
+        groups = ({n: i for n, i in images.items() if i.get_bitsize() == 8},
+                  {n: i for n, i in images.items() if i.get_bitsize() != 8})
+        self._pages = []
+        for page, group in enumerate(groups):
+            if not group:
+                continue
+            cell_w = max(image.get_width() for image in group.values())
+            cell_h = max(image.get_height() for image in group.values())
+            rows = -(-len(group) // FONT_ATLAS_COLUMNS)
+
+            surface = pygame.Surface((FONT_ATLAS_COLUMNS * cell_w, rows * cell_h), pygame.SRCALPHA)
+            for i, (name, image) in enumerate(group.items()):
+                x, y = (i % FONT_ATLAS_COLUMNS) * cell_w, (i // FONT_ATLAS_COLUMNS) * cell_h
+                surface.blit(image, (x, y))
+                self.rects[name] = (len(self._pages), pygame.Rect(x, y, *image.get_size()))
+            # glyphs that were 8-bit on their own still are packed together (unless their colours add up past 255)
+            self._pages.append((palettizeSprite(surface) or surface) if page == 0 else surface)
+
+        # every printable char that has a glyph
+        for code in range(33, 127):
+            name = TRANSLATION_TABLE.get(chr(code), chr(code).upper())
+            if name in self.rects:
+                self.chars[chr(code)] = name
+
+    def surface(self, name: str, tint: tuple[int, int, int] | None = None, scale: float = 1) -> pygame.Surface:
+        """The (tinted, scaled) atlas page holding glyph `name`; rect() is where on it."""
+        with self._lock:
+            if self._pages is None:
+                self._build()
+            page = self.rects.get(name, self.rects[MISSING_GLYPH])[0]
+            key = (page, tint, scale)
+            atlas = self._surfaces.get(key)
+            if atlas is None:
+                if tint is not None:
+                    atlas = recolourSprite(self._scaled(page, scale), tint)
+                else:
+                    atlas = self._scaled(page, scale)
+                self._surfaces[key] = atlas
+            return atlas
+
+    def _scaled(self, page, scale):
+        key = (page, None, scale)
+        if key not in self._surfaces:
+            self._surfaces[key] = scaleSprite(None, self._pages[page], scale) if scale != 1 else self._pages[page]
+        return self._surfaces[key]
+
+    def rect(self, name: str, scale: float = 1) -> pygame.Rect:
+        rect = self.rects.get(name, self.rects[MISSING_GLYPH])[1]
+        return pygame.Rect(rect.x * scale, rect.y * scale, rect.w * scale, rect.h * scale)
+
+    def char_glyph(self, char: str) -> str | None:
+        if self._pages is None:
+            self.surface(MISSING_GLYPH)
+        return self.chars.get(char)
+
+    def invalidate(self):
+        """Drop the scaled / tinted pages (rescale); the packed base pages are kept."""
+        with self._lock:
+            self._surfaces.clear()
+
+# Singleton instance
+fontAtlas = FontAtlas()
+
+
 # -------------------------
 # UI base class
 # -------------------------
@@ -91,7 +187,7 @@ class UI(Sprite):
     """
     Base UI sprite class for rendering text into a fixed grid.
     Each cell holds either:
-      - a glyph instance (subclass of UI created dynamically),
+      - a Glyph (font atlas name + tint),
       - REAL_SPACE sentinel,
       - or None for empty.
     """
@@ -106,26 +202,32 @@ class UI(Sprite):
 
     def clear(self):
         """Reset the text grid to empty (None) cells."""
-        self.text_array = np.full((config.MAX_ROW, config.MAX_COL), None)
+        self.text_array = np.full((self.world.config.MAX_ROW, self.world.config.MAX_COL), None)
         return self.text_array
 
-    def translateIntoClass(self, char: str):
+    def translateIntoGlyph(self, char: str):
         """
-        Convert a single character into its corresponding glyph class instance.
+        Convert a single character into its Glyph, in the current colour.
         Returns REAL_SPACE for a space character, or None if no glyph exists.
         """
         if char == " ":
             return REAL_SPACE
 
-        key = char.upper()
-        key = TRANSLATION_TABLE.get(char, key)
-        cls = globals().get(key)
-        if not cls:
+        name = fontAtlas.char_glyph(char)
+        if name is None:
             return None
+        return Glyph(name, self.current_colour)
 
-        instance = cls()
-        instance.colour_override = self.current_colour
-        return instance
+    def translateDynamicInput(self, default_bound_key: str):
+        """
+        The Glyph for a ~(key) token.
+        Controller mode: the controller icon (e.g., xbx_x) the world's input manager picks.
+        Keyboard mode: the key's own letter, in the current colour (changeText expands long keys
+        into several glyphs instead, so this only sees single-character tokens there).
+        """
+        if self.world.input.last_input_method != "Default":
+            return Glyph(self.world.input.get_sprite_for_keyboard_key(default_bound_key) or MISSING_GLYPH)
+        return Glyph(default_bound_key.upper(), self.current_colour)
 
     # -------------------------
     # Main text rendering
@@ -144,6 +246,9 @@ class UI(Sprite):
         if not text:
             return
 
+        # what the grid looked like before this change (IncrementalText diffs against it)
+        self.previous_text_array = np_copy(self.text_array)
+
         # Start at top if no row specified
         if row is None:
             self.clear()
@@ -155,7 +260,7 @@ class UI(Sprite):
         length = len(text)
 
         while i < length:
-            if row >= config.MAX_ROW:
+            if row >= self.world.config.MAX_ROW:
                 break
 
             ch = text[i]
@@ -181,31 +286,27 @@ class UI(Sprite):
 
                         # LONG LITERAL KEYS
                         if len(literal_key) > 1:
-                            if inputManager.last_input_method != "Default":
-                                dyn = DynamicInput()
-                                dyn.update_sprite(literal_key)
-                                self.text_array[row][col] = dyn
+                            if self.world.input.last_input_method != "Default":
+                                self.text_array[row][col] = self.translateDynamicInput(literal_key)
                                 col += 1
                                 i = end + 1
                                 continue
 
                             expanded = ABBREVIATION_TABLE.get(literal_key.lower(), literal_key.lower())
                             for ch2 in expanded.upper():
-                                if col >= config.MAX_COL:
+                                if col >= self.world.config.MAX_COL:
                                     row += 1
                                     col = 0
-                                    if row >= config.MAX_ROW:
+                                    if row >= self.world.config.MAX_ROW:
                                         break
-                                self.text_array[row][col] = self.translateIntoClass(ch2)
+                                self.text_array[row][col] = self.translateIntoGlyph(ch2)
                                 col += 1
 
                             i = end + 1
                             continue
 
                         # SINGLE-CHAR LITERAL
-                        dyn = DynamicInput()
-                        dyn.update_sprite(literal_key)
-                        self.text_array[row][col] = dyn
+                        self.text_array[row][col] = self.translateDynamicInput(literal_key)
                         col += 1
                         i = end + 1
                         continue
@@ -242,7 +343,7 @@ class UI(Sprite):
             # Newline/backtick
             if ch == "`":
                 row += 1
-                if row < config.MAX_ROW:
+                if row < self.world.config.MAX_ROW:
                     self.text_array[row].fill(None)
                 col = 0
                 i += 1
@@ -251,22 +352,22 @@ class UI(Sprite):
             # Tab (insert 4 spaces)
             if ch == "¬":
                 for _ in range(4):
-                    if col >= config.MAX_COL:
+                    if col >= self.world.config.MAX_COL:
                         row += 1
                         col = 0
-                    if row >= config.MAX_ROW:
+                    if row >= self.world.config.MAX_ROW:
                         break
                     col += 1
                 i += 1
                 continue
 
             # Regular character
-            if col < config.MAX_COL:
-                self.text_array[row][col] = self.translateIntoClass(ch)
+            if col < self.world.config.MAX_COL:
+                self.text_array[row][col] = self.translateIntoGlyph(ch)
                 col += 1
 
             # Auto-wrap
-            if col >= config.MAX_COL:
+            if col >= self.world.config.MAX_COL:
                 row += 1
                 col = 0
 
@@ -274,10 +375,9 @@ class UI(Sprite):
 
         # Apply justification unless explicitly skipped
         if not skip_justify:
-            for r in range(config.MAX_ROW):
+            for r in range(self.world.config.MAX_ROW):
                 self.text_array[r] = self.justify_row(self.text_array[r])
 
-        self.previous_text_array = np_copy(self.text_array)
         return self.text_array
 
     # -------------------------
@@ -290,7 +390,7 @@ class UI(Sprite):
 
     def justify_row(self, row_data):
         """Return a new row array with the chosen justification applied."""
-        max_col = config.MAX_COL
+        max_col = self.world.config.MAX_COL
 
         def is_real_space(g):
             return g is REAL_SPACE
@@ -355,76 +455,86 @@ class UI(Sprite):
 
             return np.asarray(new_row[:max_col])
 
+# Singleton UI instance used by render_text()
+spritesUI = UI()
+
 # -------------------------
-# Dynamic input glyph
+# Pre-composited text blocks
 # -------------------------
 
-class DynamicInput(UI):
+# Whole strings already drawn, see render_text
+TEXT_BLOCK_CACHE_MAX = 64
+
+class TextBlock(Sprite):
     """
-    Represents a single dynamic input glyph. In controller mode this becomes
-    a single controller icon (resolved via inputManager). In keyboard mode
-    the changeText() function expands long tokens into multiple glyphs, so
-    DynamicInput is only used for single-character tokens like ~(c).
+    A whole render_text() string as a single sprite: every glyph blitted once onto one surface,
+    instead of one Sprite (and one draw) per character. The surface is shared via the text block cache.
     """
 
-    def __init__(self):
+    def __init__(self, surface):
         super().__init__()
-
-    def update_sprite(self, default_bound_key: str):
-        """
-        Replace this glyph's spritesheet with the appropriate texture.
-        Controller mode: use controller icon (e.g., xbx_x.png).
-        Keyboard mode: leave to changeText expansion (no single 'ESCAPE.png' lookup).
-        """
-
-        if inputManager.last_input_method != "Default":
-            translated_key = inputManager.get_sprite_for_keyboard_key(default_bound_key)
-            if translated_key:
-                self.replace_spritesheet([[fonts_dir / f"{translated_key}.png"]])
-        else:
-            # In keyboard mode we do not attempt to load a single texture named
-            # after the long key (e.g., ESCAPE). changeText expands long keys
-            # into multiple glyphs; for single-letter tokens we can still show
-            # the letter texture if desired.
-
-            # Always inherit the active colour from the UI renderer
-            self.colour_override = spritesUI.current_colour
-
-            # Replace the spritesheet with keyboard equivalents
-            self.replace_spritesheet([[fonts_dir / f"{default_bound_key.upper()}.png"]])
-
-# -------------------------
-# Dynamic glyph class generation
-# -------------------------
-
-def make_class_name(filename: str) -> str:
-    """Convert a filename (e.g., 'a.png' or '0.png') into a class name."""
-    name = filename.replace(".png", "")
-    if name.isdigit():
-        digit_names = ["Zero", "One", "Two", "Three", "Four",
-                       "Five", "Six", "Seven", "Eight", "Nine"]
-        return digit_names[int(name)]
-    return name.capitalize()
-
-def make_init(filepath):
-    """Factory to create __init__ for dynamically generated glyph classes."""
-    def __init__(self):
-        super(type(self), self).__init__()
-        self.spritesheet = [[filepath]]
-        self.colour_override = None
         self.team = "ui"
-    return __init__
-
-# Create glyph classes for each PNG in the font directory
-for file in fonts_dir.iterdir():
-    if file.suffix.lower() != ".png":
-        continue
-    class_name = make_class_name(file.name)
-    cls = type(class_name, (UI,), {"__init__": make_init(file)})
-    globals()[class_name] = cls
-
-# Singleton UI instance used by render_text()
-spritesUI = UI()
+        self.block_surface = surface
+
+    def _refresh_surfaces(self):
+        # already at the right scale; a rescale re-renders the text instead (client UI caches)
+        self.surface_render = self.block_surface
+        if self.sprite_rect:
+            self.sprite_rect.size = self.surface_render.get_size()
+
+class TextBlockCache:
+    """LRU of (surface, top row, left col) keyed by (text, justification, scale, input device)."""
+
+    def __init__(self, max_entries=TEXT_BLOCK_CACHE_MAX):
+        self.max_entries = max_entries
+        self._blocks: OrderedDict[tuple, tuple | None] = OrderedDict()
+        self._lock = threading.Lock() # render_text_background
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._blocks:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+                return True, self._blocks[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, block):
+        with self._lock:
+            self._blocks[key] = block
+            while len(self._blocks) > self.max_entries:
+                self._blocks.popitem(last=False)
+
+    def __len__(self):
+        return len(self._blocks)
+
+textBlockCache = TextBlockCache()
+
+def _compose_text_block(text_array, scale, cell_size):
+    """Blit every glyph of a changeText() grid (out of the font atlas) onto one surface covering just the rows / cols in use."""
+    cells = [
+        (r, c, glyph)
+        for r, row in enumerate(text_array)
+        for c, glyph in enumerate(row)
+        if glyph is not None and glyph is not REAL_SPACE
+    ]
+    if not cells:
+        return None
+
+    top = min(r for r, _, _ in cells)
+    left = min(c for _, c, _ in cells)
+    size = cell_size * scale
+    width = (max(c for _, c, _ in cells) - left + 1) * size
+    height = (max(r for r, _, _ in cells) - top + 1) * size
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.blits([
+        (fontAtlas.surface(glyph.name, glyph.colour, scale), ((c - left) * size, (r - top) * size), fontAtlas.rect(glyph.name, scale))
+        for r, c, glyph in cells
+    ], doreturn=False)
+    return surface, top, left
 
 # -------------------------
 # Public API
@@ -467,73 +577,219 @@ class RenderFuture:
     def exception(self):
         return self._exc
 
-def _render_text_sync(text: str, justification: str | None = "centre") -> list:
+class IncrementalText:
     """
-    Internal synchronous renderer. This contains the original render logic
-    and is used by both the blocking API and the background worker.
+    One text slot on screen (the client's UI text, the debug overlay) whose string changes a little at a time.
+    Kept as one full-width TextBlock per grid row: a new string is laid out in the slot's own UI and
+    diffed against its previous_text_array, so only rows that changed get a new surface, and only the
+    changed cells of those are cleared and re-blitted (a countdown tick redraws a digit, not the screen).
     """
-    # Safety fps checks:
-    global last_render_epoch, lre_buffer, abc
-    if last_render_epoch + lre_buffer > time.time():
-        print("ui_sprites : render_text : ⚠️  [WARNING] You are calling this method too often, consider caching your results! This will impact performance substancially")
-    last_render_epoch = time.time()
-
-    if justification is not None:
-        spritesUI.set_justification(justification)
 
-    text_array = spritesUI.changeText(text=text, skip_justify=(justification is None))
-    if text_array is None:
-        return []
-
-    rows, cols = text_array.shape
-    spawned_sprites = []
-
-    for r in range(rows):
-        for c in range(cols):
-            glyph = text_array[r][c]
-            if glyph is None or glyph is REAL_SPACE:
+    def __init__(self):
+        self.ui = UI()
+        self.rows: dict[int, TextBlock] = {}
+        self._key = None
+
+        # Stats
+        self.cells_redrawn = 0
+
+    def reset(self):
+        """Forget what is on screen; the next render() builds every row from scratch."""
+        self.rows = {}
+        self._key = None
+
+    def render(self, text: str, justification: str | None = "centre") -> list:
+        """The slot's TextBlocks for `text`, top to bottom (rows that didn't change are the same objects as before)."""
+        world = current_world()
+        scale = world.config.resolution_scale
+        family = world.input.get_controller_family()
+        key = (scale, (family, world.input.mode) if family else None)
+        if key != self._key:
+            self.reset()
+            self._key = key
+
+        self.ui.world = world
+        if justification is not None:
+            self.ui.set_justification(justification)
+        if self.ui.changeText(text=text, skip_justify=(justification is None)) is None:
+            # nothing to show: diff against an empty grid
+            self.ui.previous_text_array = np_copy(self.ui.text_array)
+            self.ui.clear()
+
+        size = world.config.CELL_SIZE * scale
+        for r, (row, previous_row) in enumerate(zip(self.ui.text_array, self.ui.previous_text_array)):
+            # spaces and empty cells draw the same
+            visible = [glyph if isinstance(glyph, Glyph) else None for glyph in row]
+            block = self.rows.get(r)
+
+            if not any(visible):
+                self.rows.pop(r, None)
                 continue
 
-            colour = getattr(glyph, "colour_override", None)
-            spawned = glyph.summon(
-                target_row=r,
-                target_col=c,
-                screen=None,
-                colour=colour
-            )
-            spawned_sprites.append(spawned)
+            if block is None:
+                surface = pygame.Surface((len(row) * size, size), pygame.SRCALPHA)
+                changed = range(len(row))
+            else:
+                previous_visible = [glyph if isinstance(glyph, Glyph) else None for glyph in previous_row]
+                changed = [c for c in range(len(row)) if visible[c] != previous_visible[c]]
+                if not changed:
+                    continue
+                surface = block.block_surface.copy()
+                for c in changed:
+                    surface.fill((0, 0, 0, 0), (c * size, 0, size, size))
+
+            surface.blits([
+                (fontAtlas.surface(visible[c].name, visible[c].colour, scale), (c * size, 0), fontAtlas.rect(visible[c].name, scale))
+                for c in changed if visible[c]
+            ], doreturn=False)
+            self.cells_redrawn += len(changed)
+            self.rows[r] = TextBlock(surface).summon(target_row=r, target_col=0, screen=None)
+
+        return [self.rows[r] for r in sorted(self.rows)]
+
+def _text_block_key(text: str, justification: str | None):
+    """What a rendered block depends on: the text, its layout, the scale and the input device."""
+    world = current_world()
+    # ~(key) tokens draw as controller icons picked by family and the mode's bindings, else as letters
+    family = world.input.get_controller_family()
+    device = (family, world.input.mode) if family else None
+    return (text, justification, world.config.resolution_scale, device)
+
+def _text_block(text: str, justification: str | None = "centre", ui: UI | None = None):
+    """
+    Internal synchronous renderer, used by both the blocking API and the background worker.
+    Returns the composited (surface, top row, left col), or None for nothing visible; cached.
+    `ui`: the layout state to use; the background worker passes its own, the default is spritesUI.
+    """
+    world = current_world()
+    key = _text_block_key(text, justification)
+
+    found, block = textBlockCache.get(key)
+    if not found:
+        if ui is None:
+            # Safety fps checks (only the real work on the calling thread counts):
+            global last_render_epoch, lre_buffer, abc
+            if last_render_epoch + lre_buffer > time.time():
+                print("ui_sprites : render_text : ⚠️  [WARNING] You are calling this method too often, consider caching your results! This will impact performance substancially")
+            last_render_epoch = time.time()
+            ui = spritesUI
+
+        # glyphs (and their input icons) belong to whichever world asked for the text
+        ui.world = world
+
+        if justification is not None:
+            ui.set_justification(justification)
+
+        text_array = ui.changeText(text=text, skip_justify=(justification is None))
+        block = _compose_text_block(text_array, world.config.resolution_scale, world.config.CELL_SIZE) if text_array is not None else None
+        textBlockCache.put(key, block)
+
+    return block
+
+def _spawn_text_block(block) -> list:
+    """A fresh TextBlock sprite (the caller's own, sprites are mutable) over a shared composited surface."""
+    if block is None:
+        return []
 
-    return spawned_sprites
+    surface, row, col = block
+    return [TextBlock(surface).summon(target_row=row, target_col=col, screen=None)]
 
 def render_text(text: str, justification: str | None = "centre") -> list:
     """
-    Convert a formatted text string into a list of positioned sprite instances.
-    Returns an empty list if nothing to render.
+    Convert a formatted text string into a list of positioned sprite instances
+    (one pre-composited TextBlock). Returns an empty list if nothing to render.
 
     This is the original synchronous API preserved for compatibility.
     """
-    return _render_text_sync(text, justification)
+    return _spawn_text_block(_text_block(text, justification))
+
+# Background renders: jobs waiting beyond this make render_text_background block until the worker catches up
+TEXT_RENDER_QUEUE_MAX = 32
+
+class TextRenderFuture:
+    """
+    One caller's handle on a (maybe shared) background render: the worker only memoizes the composited
+    surface, result() spawns this caller's own TextBlock over it, in the world it was asked for from.
+    """
+
+    def __init__(self, block_future: RenderFuture):
+        self._block_future = block_future
+        self._world = current_world()
+        self._sprites = None
+
+    def done(self):
+        return self._block_future.done()
+
+    def result(self, timeout=None):
+        if self._sprites is None:
+            block = self._block_future.result(timeout)
+            with self._world.active():
+                self._sprites = _spawn_text_block(block)
+        return self._sprites
 
-def render_text_background(text: str, justification: str | None = "centre") -> RenderFuture:
+    def exception(self):
+        return self._block_future.exception()
+
+class TextRenderWorker:
+    """
+    One long-lived daemon thread composing render_text() surfaces off a bounded queue.
+    Every job gets its own UI (no layout state shared with spritesUI or other jobs) and runs in the
+    submitter's context, so in its world. The block futures are memoized by the text block key, so
+    asking for the same (text, justification) again is already done, or waits on the pending job.
     """
-    Enqueue a background render job and return a RenderFuture handle.
 
-    The background worker is implemented as a short-lived daemon thread per request.
-    The thread will exit automatically once the job completes (daemon ensures it
-    won't block process shutdown). Use .result() on the returned handle to obtain
-    the spawned sprites list when ready.
+    def __init__(self, max_queue=TEXT_RENDER_QUEUE_MAX, max_futures=TEXT_BLOCK_CACHE_MAX):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._futures: OrderedDict[tuple, RenderFuture] = OrderedDict()
+        self.max_futures = max_futures
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, text: str, justification: str | None = "centre") -> TextRenderFuture:
+        key = _text_block_key(text, justification)
+
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+                return TextRenderFuture(future)
+
+            future = self._futures[key] = RenderFuture()
+            while len(self._futures) > self.max_futures:
+                self._futures.popitem(last=False)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="text-render", daemon=True)
+                self._thread.start()
+
+        self._queue.put((key, text, justification, contextvars.copy_context(), future))
+        return TextRenderFuture(future)
+
+    def _run(self):
+        while True:
+            key, text, justification, context, future = self._queue.get()
+            try:
+                future.set_result(context.run(self._render, text, justification))
+            except Exception as e:
+                # don't memoize failures, the next request tries again
+                with self._lock:
+                    if self._futures.get(key) is future:
+                        del self._futures[key]
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _render(text, justification):
+        return _text_block(text, justification, ui=UI())
+
+# Singleton instance
+textRenderWorker = TextRenderWorker()
+
+def render_text_background(text: str, justification: str | None = "centre") -> TextRenderFuture:
+    """
+    Queue a render on the background worker and return a handle on it (maybe already done,
+    if the same text was asked for before). Use .result() on it to get the sprites list when ready;
+    the sprites are this caller's own, only the surface underneath is shared.
     """
-    future = RenderFuture()
-
-    def _worker():
-        try:
-            result = _render_text_sync(text, justification)
-            future.set_result(result)
-        except Exception as e:
-            future.set_exception(e)
-
-    # Start a short-lived daemon thread for this render job.
-    # It will die as soon as the work completes.
-    t = threading.Thread(target=_worker, daemon=True)
-    t.start()
-    return future
+    return textRenderWorker.submit(text, justification)
@@ -0,0 +1,43 @@
+# py_world.py - everything one running game reads: config, rng, input source and audio sink
+#
+# The client's singletons (config, inputManager, soundMixer, rng) make up the default world, so a
+# normal game behaves exactly as before. Anything that wants its own independent match (headless
+# simulations, several games in one process) builds another World and runs inside `world.active()`:
+# sprites bind to whichever world is active when they are constructed.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from py_config import Config, config
+from py_rng import GameRNG, rng
+from py_input import InputManager, inputManager
+from py_soundmixer import SoundMixer, soundMixer
+
+
+class World:
+    def __init__(self, config: Config | None = None, rng: GameRNG | None = None,
+                 input: InputManager | None = None, audio: SoundMixer | None = None):
+        self.config = config if config is not None else Config()
+        self.rng = rng if rng is not None else GameRNG()
+        self.input = input if input is not None else InputManager(self.config)
+        # only one world can own the audio device, extra ones are silent unless given a mixer
+        self.audio = audio if audio is not None else SoundMixer(enabled=False)
+
+    @contextmanager
+    def active(self):
+        """Make this the world new sprites (and the render helpers) pick up, for this thread / task."""
+        token = _current_world.set(self)
+        try:
+            yield self
+        finally:
+            _current_world.reset(token)
+
+
+# The client's own singletons
+default_world = World(config, rng, inputManager, soundMixer)
+
+_current_world: ContextVar[World] = ContextVar("world", default=default_world)
+
+
+def current_world() -> World:
+    return _current_world.get()
@@ -1,6 +1,14 @@
-import json, uuid, random, time
+import json, uuid, time, bisect, asyncio, os
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
+
+from py_simulation import PongSimulation, TICK_RATE, new_simulation
+from py_replay import ReplayWriter, KEYFRAME_INTERVAL_TICKS
+from py_rng import GameRNG
+from py_netstats import NetStats, message_type, NETSTATS_DUMP_S
 
 
 app = FastAPI()
@@ -12,6 +20,34 @@ app = FastAPI()
 clients: dict[WebSocket, dict] = {}
 lobbies: dict[str, dict] = {}
 
+# Lobbies with a free slot, oldest waiting first (lobby_id -> None).
+# OrderedDict keeps pop/peek of the oldest entry O(1) no matter how many are waiting.
+open_lobbies: OrderedDict[str, None] = OrderedDict()
+
+# Sorted (name, id) indexes for paginated / prefix-filtered lobby queries.
+# `lobby_index_open` only holds lobbies that are also in `open_lobbies`.
+lobby_index_all: list[tuple[str, str]] = []
+lobby_index_open: list[tuple[str, str]] = []
+
+# Bumped on every lobby change. GET /lobbies caches its serialized body per version and
+# uses it for the ETag (salted with a boot id, so a restarted server never reuses a tag).
+lobby_version = 0
+lobby_snapshot: tuple[int, bytes, str] | None = None
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# Running matches, keyed by the lobby id they started from
+rooms: dict[str, dict] = {}
+
+# Lobby names and room seeds (seed it to make a whole server session reproducible)
+server_rng = GameRNG()
+
+# Replay files are written here, one worker so every room's chunks land in order
+replay_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replay")
+
+# Every websocket message in/out, per type (GET /metrics, and dumped to NETSTATS_PATH)
+net_stats = NetStats()
+net_stats_task: asyncio.Task | None = None
+
 # -----------------------------
 # SERVER SETTINGS
 # -----------------------------
@@ -19,12 +55,44 @@ lobbies: dict[str, dict] = {}
 LOBBY_RATE_LIMIT_REFRESH_S = 30
 LOBBY_RATE_LIMIT_CAP = 15
 
+LOBBY_PAGE_DEFAULT = 8
+LOBBY_PAGE_MAX = 20
+
+ROOM_TICK_RATE = TICK_RATE
+# Integer subpixel physics (FixedPongSimulation): identical results on every machine, so replays
+# and client-side re-simulation never drift from the server
+ROOM_FIXED_POINT = True
+
+# "snapshot": the server simulates and streams room_state to everyone.
+# "rollback": players simulate locally and the server relays their per-tick inputs; its own copy
+# of the match steps in lockstep once both inputs for a tick are in (for spectators/replays/game over).
+ROOM_NETCODES = ("snapshot", "rollback")
+ROOM_NETCODE_DEFAULT = "snapshot"
+# Rollback rooms: most ticks the server copy may catch up in one loop, and how far ahead of it
+# an input may be before it is dropped
+ROLLBACK_CATCHUP_TICKS = 8
+ROLLBACK_MAX_INPUT_LEAD = 10 * TICK_RATE
+# Spectators get every Nth frame, and only once it is SPECTATOR_DELAY_S old
+SPECTATOR_TICK_DIVISOR = 3
+SPECTATOR_DELAY_S = 2
+
+# Per-room match recordings, off unless PONG_REPLAY_DIR is set (nothing prunes them, so not by
+# default on a hosted server). Buffered in memory, written once this much piles up.
+REPLAY_DIR = os.environ.get("PONG_REPLAY_DIR") or None
+REPLAY_FLUSH_BYTES = 4096
+
+# Bandwidth snapshots, one JSON line every NETSTATS_DUMP_S, off unless PONG_NETSTATS_PATH is set
+# (the file is never rotated; GET /metrics works either way)
+NETSTATS_PATH = os.environ.get("PONG_NETSTATS_PATH") or None
+
 # -----------------------------
 # Helpers
 # -----------------------------
 
 async def send(ws: WebSocket, payload: dict):
-    await ws.send_text(json.dumps(payload))
+    text = json.dumps(payload)
+    net_stats.record("out", payload.get("type", "other"), len(text))
+    await ws.send_text(text)
 
 
 async def reject_request():
@@ -36,22 +104,70 @@ async def reject_request():
         await send(ws, payload)
 
 
-async def broadcast_lobbies():
-    payload = {
+def index_add(index: list, lobby: dict):
+    entry = (lobby["name"], lobby["id"])
+    i = bisect.bisect_left(index, entry)
+    if i == len(index) or index[i] != entry:
+        index.insert(i, entry)
+
+
+def index_remove(index: list, lobby: dict):
+    entry = (lobby["name"], lobby["id"])
+    i = bisect.bisect_left(index, entry)
+    if i < len(index) and index[i] == entry:
+        index.pop(i)
+
+
+def lobby_entry(lobby: dict) -> dict:
+    room = rooms.get(lobby["id"])
+    return {
+        "id": lobby["id"],
+        "name": lobby["name"],
+        "players": len(lobby["players"]),
+        "max_players": lobby["max_players"],
+        "running": room is not None,
+        "spectators": len(room["spectators"]) if room else 0,
+        "netcode": lobby["netcode"],
+    }
+
+
+def lobby_page(query: dict) -> dict:
+    """
+    Build one page of the lobby list for a client's saved query.
+    Both indexes are sorted by name, so a prefix filter is two bisects and the
+    page itself is a slice: the payload never grows with the lobby count.
+    """
+    index = lobby_index_open if query.get("free") else lobby_index_all
+    prefix = query.get("prefix", "").upper()
+
+    lo, hi = 0, len(index)
+    if prefix:
+        lo = bisect.bisect_left(index, (prefix,))
+        hi = bisect.bisect_left(index, (prefix + "\uffff",))
+
+    offset = max(0, query.get("offset", 0))
+    limit = max(1, min(LOBBY_PAGE_MAX, query.get("limit", LOBBY_PAGE_DEFAULT)))
+    start = min(lo + offset, hi)
+
+    page = [lobby_entry(lobbies[lid]) for _, lid in index[start:min(start + limit, hi)]]
+
+    return {
         "type": "lobby_list",
-        "lobbies": [
-            {
-                "id": lid,
-                "name": lobby["name"],
-                "players": len(lobby["players"]),
-                "max_players": lobby["max_players"],
-            }
-            for lid, lobby in lobbies.items()
-        ],
+        "lobbies": page,
+        "offset": start - lo,
+        "total": hi - lo,
     }
 
+
+async def send_lobby_page(ws: WebSocket):
+    await send(ws, lobby_page(clients[ws]["query"]))
+
+
+async def broadcast_lobbies():
+    # every client gets the page they are looking at, not the whole list
     for ws in list(clients):
-        await send(ws, payload)
+        if ws in clients:
+            await send_lobby_page(ws)
 
 
 async def send_lobby_status(ws: WebSocket):
@@ -87,10 +203,543 @@ def remove_from_lobby(ws: WebSocket):
     # Delete empty lobby
     if not lobby["players"]:
         lobbies.pop(lobby_id, None)
+        index_remove(lobby_index_all, lobby)
 
+    on_lobby_changed(lobby)
     clients[ws]["lobby"] = None
 
 
+def bump_lobby_version():
+    global lobby_version
+    lobby_version += 1
+
+
+def on_lobby_changed(lobby: dict):
+    """Keep `open_lobbies`, the indexes and `lobby_version` in sync after a lobby's player list changed."""
+    bump_lobby_version()
+
+    lobby_id = lobby["id"]
+    waiting = lobby_id in lobbies and 0 < len(lobby["players"]) < lobby["max_players"]
+
+    if waiting:
+        # re-opened lobbies go to the back of the queue, they start waiting again
+        open_lobbies.setdefault(lobby_id, None)
+        index_add(lobby_index_open, lobby)
+    else:
+        open_lobbies.pop(lobby_id, None)
+        index_remove(lobby_index_open, lobby)
+
+
+def create_lobby(ws: WebSocket, owner: str, netcode: str = ROOM_NETCODE_DEFAULT) -> dict:
+    lobby_id = str(uuid.uuid4())[:8]
+
+    words = [
+        "PONG","BALL","WHAM","SPIN","GAME","PLAY","MISS","BEEP",
+        "DING","BUMP","WALL","NETS","EDGE","ZONE","DUEL","COOP",
+        "MODE","FAST","SLOW","HOST","JOIN"
+    ]
+    name = f"{server_rng.choice(words)}-{server_rng.randint(1000,9999)}"
+
+    lobby = {
+        "id": lobby_id,
+        "owner": owner,
+        "name": name,
+        "players": [ws],
+        "max_players": 2,
+        "netcode": netcode,
+    }
+    lobbies[lobby_id] = lobby
+    index_add(lobby_index_all, lobby)
+    on_lobby_changed(lobby)
+
+    clients[ws]["lobby"] = lobby_id
+    return lobby
+
+
+async def join_lobby(ws: WebSocket, lobby: dict):
+    lobby["players"].append(ws)
+    clients[ws]["lobby"] = lobby["id"]
+    on_lobby_changed(lobby)
+
+    await send_lobby_status(ws)
+    await broadcast_lobbies()
+
+    # Auto-start when full
+    if len(lobby["players"]) == lobby["max_players"]:
+        await start_room(lobby)
+
+
+# -----------------------------
+# Rooms
+# -----------------------------
+
+async def send_raw(ws: WebSocket, frame: str):
+    # one frame is shared by many sockets, a dead one shouldn't stall the rest
+    net_stats.record("out", message_type(frame), len(frame))
+    try:
+        await ws.send_text(frame)
+    except Exception:
+        pass
+
+
+async def start_room(lobby: dict):
+    sim = new_simulation(ROOM_FIXED_POINT, seed=server_rng.getrandbits(32))
+
+    replay = None
+    if REPLAY_DIR:
+        replay = ReplayWriter(f"{REPLAY_DIR}/{lobby['id']}.pongrec")
+        replay.header(sim, lobby["name"])
+
+    room = {
+        "id": lobby["id"],
+        "name": lobby["name"],
+        "players": list(lobby["players"]),
+        "inputs": [0] * len(lobby["players"]),
+        "spectators": set(),
+        # (tick, encoded frame) waiting out the spectator delay
+        "spectator_frames": deque(),
+        "sim": sim,
+        "replay": replay,
+        "task": None,
+        "netcode": lobby["netcode"],
+        # rollback only: per slot, tick -> dir not yet simulated by the server copy
+        "pending_inputs": [{} for _ in lobby["players"]],
+        # newest input seq seen per slot (packets repeat older inputs for redundancy)
+        "input_seq": [0] * len(lobby["players"]),
+        "input_duplicates": 0,
+    }
+    rooms[room["id"]] = room
+    bump_lobby_version()
+
+    for slot, player in enumerate(room["players"]):
+        await send(player, {
+            "type": "start_game",
+            "slot": slot,
+            "netcode": room["netcode"],
+            # everything a client needs to run an identical simulation (rollback)
+            "seed": sim.seed,
+            "fixed_point": sim.fixed_point,
+            "match_seconds": sim.match_seconds,
+        })
+
+    room["task"] = asyncio.create_task(run_room(room))
+
+
+async def run_room(room: dict):
+    sim: PongSimulation = room["sim"]
+    tick_s = 1 / ROOM_TICK_RATE
+    next_tick = time.perf_counter()
+
+    pending = room["pending_inputs"]
+
+    while not sim.finished and rooms.get(room["id"]) is room:
+        if room["netcode"] == "rollback":
+            # lockstep: only step ticks both players have sent
+            for _ in range(ROLLBACK_CATCHUP_TICKS):
+                tick = sim.tick + 1
+                if sim.finished or not all(tick in inputs for inputs in pending):
+                    break
+                await step_room(room, [inputs.pop(tick) for inputs in pending])
+        else:
+            await step_room(room, room["inputs"])
+
+        # fixed rate, without drifting when a tick runs long
+        next_tick += tick_s
+        await asyncio.sleep(max(0, next_tick - time.perf_counter()))
+
+    if rooms.get(room["id"]) is room:
+        await end_room(room, "finished")
+
+
+async def step_room(room: dict, inputs: list):
+    sim: PongSimulation = room["sim"]
+    replay: ReplayWriter | None = room["replay"]
+
+    if replay:
+        replay.inputs(sim.tick + 1, inputs)
+
+    events = sim.step(inputs)
+    await broadcast_room_frame(room, events)
+
+    if replay:
+        if sim.tick % KEYFRAME_INTERVAL_TICKS == 0:
+            replay.keyframe(sim)
+        if replay.pending >= REPLAY_FLUSH_BYTES:
+            flush_replay(replay)
+
+
+def flush_replay(replay: ReplayWriter, close: bool = False):
+    """Hand the buffered records to the replay thread; never blocks the tick."""
+    write = replay.close if close else replay.write
+    asyncio.get_running_loop().run_in_executor(replay_io, write, replay.take())
+
+
+async def broadcast_room_frame(room: dict, events: list):
+    """Encode this tick once, then hand the same string to players and (later) spectators."""
+    sim: PongSimulation = room["sim"]
+    frame = json.dumps({
+        "type": "room_state",
+        **sim.snapshot(),
+        "events": events,
+        "spectators": len(room["spectators"]),
+    })
+
+    # rollback players run their own simulation
+    if room["netcode"] != "rollback":
+        for ws in room["players"]:
+            await send_raw(ws, frame)
+
+    # -- Spectators: lower rate, delayed
+    frames = room["spectator_frames"]
+    if sim.tick % SPECTATOR_TICK_DIVISOR == 0:
+        frames.append((sim.tick, frame))
+
+    release_tick = sim.tick - SPECTATOR_DELAY_S * ROOM_TICK_RATE
+    delayed = None
+    while frames and frames[0][0] <= release_tick:
+        delayed = frames.popleft()[1]
+
+    if delayed:
+        for ws in list(room["spectators"]):
+            await send_raw(ws, delayed)
+
+
+async def end_room(room: dict, reason: str):
+    if rooms.pop(room["id"], None) is None:
+        return
+
+    task = room["task"]
+    if task and task is not asyncio.current_task():
+        task.cancel()
+
+    if room["replay"]:
+        room["replay"].end(room["sim"], reason)
+        flush_replay(room["replay"], close=True)
+
+    frame = json.dumps({
+        "type": "game_over",
+        "reason": reason,
+        "scores": room["sim"].scores,
+    })
+    for ws in room["players"] + list(room["spectators"]):
+        await send_raw(ws, frame)
+
+    for ws in room["spectators"]:
+        if ws in clients:
+            clients[ws]["spectating"] = None
+
+    # the lobby only existed to start this match
+    for ws in room["players"]:
+        if ws in clients:
+            remove_from_lobby(ws)
+
+    await broadcast_lobbies()
+
+
+async def leave_room(ws: WebSocket):
+    """Drop `ws` from whatever room it plays in or watches."""
+    client = clients.get(ws, {})
+
+    room = rooms.get(client.get("spectating"))
+    if room:
+        room["spectators"].discard(ws)
+        client["spectating"] = None
+        bump_lobby_version()
+
+    room = rooms.get(client.get("lobby"))
+    if room and ws in room["players"]:
+        await end_room(room, "player_left")
+
+
+# -----------------------------
+# Message router
+# -----------------------------
+
+# Upper bounds (ms) of each latency bucket, anything slower lands in the last "+inf" bucket
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
+HANDLERS: dict[str, "Route"] = {}
+unknown_message_count = 0
+
+
+def compile_schema(schema: dict | None):
+    """
+    Turn a schema like {"id": str, "owner?": str} into a validator function.
+    Fields ending in '?' are optional. The field table is built once here so
+    validating a message is just a loop over a tuple.
+    Validators return None when the message is fine, otherwise a short reason.
+    """
+    fields = tuple(
+        (name.rstrip("?"), types if isinstance(types, tuple) else (types,), not name.endswith("?"))
+        for name, types in (schema or {}).items()
+    )
+
+    def validate(msg: dict):
+        for name, types, required in fields:
+            value = msg.get(name)
+            if value is None:
+                if required:
+                    return f"missing_{name}"
+                continue
+            # exact type match, so True can't sneak through as an int
+            if type(value) not in types:
+                return f"bad_{name}"
+        return None
+
+    return validate
+
+
+class Route:
+    def __init__(self, msg_type: str, handler, schema: dict | None, rate_limited: bool):
+        self.msg_type = msg_type
+        self.handler = handler
+        self.validate = compile_schema(schema)
+        self.rate_limited = rate_limited
+
+        # stats
+        self.calls = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0,
+            "max_ms": round(self.max_ms, 3),
+            "histogram_ms": dict(zip([*map(str, LATENCY_BUCKETS_MS), "+inf"], self.histogram)),
+        }
+
+
+def route(msg_type: str, schema: dict | None = None, rate_limited: bool = True):
+    """Register a websocket message handler for `msg_type`."""
+    def decorator(handler):
+        HANDLERS[msg_type] = Route(msg_type, handler, schema, rate_limited)
+        return handler
+    return decorator
+
+
+def is_rate_limited(ws: WebSocket) -> bool:
+    now = time.time()
+
+    # -- Clear slate every 30 seconds
+    if now - clients[ws]["rlLobbyRequestTime"] >= LOBBY_RATE_LIMIT_REFRESH_S:
+        clients[ws]["rlLobbyRequestTime"] = now
+        clients[ws]["rlLobbyRequestCount"] = 0
+
+    # -- Reject user if too many lobby requests
+    if clients[ws]["rlLobbyRequestCount"] >= LOBBY_RATE_LIMIT_CAP:
+        return True
+
+    clients[ws]["rlLobbyRequestCount"] += 1
+    print(clients[ws]["rlLobbyRequestCount"],clients[ws]["rlLobbyRequestCount"])
+    return False
+
+
+async def dispatch(ws: WebSocket, msg: dict):
+    global unknown_message_count
+
+    msg_type = msg.get("type")
+    # a non-string type (e.g. a list) isn't hashable, count it like any other unknown message
+    handler_route = HANDLERS.get(msg_type) if isinstance(msg_type, str) else None
+    if handler_route is None:
+        unknown_message_count += 1
+        return
+
+    if handler_route.rate_limited and is_rate_limited(ws):
+        await reject_request()
+        return
+
+    reason = handler_route.validate(msg)
+    if reason:
+        handler_route.rejected += 1
+        await send(ws, {
+            "type": "error",
+            "message": "invalid_message",
+            "reason": reason,
+        })
+        return
+
+    started = time.perf_counter()
+    try:
+        await handler_route.handler(ws, msg)
+    finally:
+        handler_route.record((time.perf_counter() - started) * 1000)
+
+
+# -----------------------------
+# Handlers
+# -----------------------------
+
+# Only answers the asking client (no fan-out), so it is cheap enough to skip the rate limiter
+# and let the lobby browser fetch pages as the user scrolls.
+@route("list_lobbies", schema={"offset?": int, "limit?": int, "free?": bool, "prefix?": str}, rate_limited=False)
+async def handle_list_lobbies(ws: WebSocket, msg: dict):
+    clients[ws]["query"] = {
+        key: msg[key] for key in ("offset", "limit", "free", "prefix") if msg.get(key) is not None
+    }
+    await send_lobby_page(ws)
+    await send_lobby_status(ws)
+
+
+@route("leave_lobby")
+async def handle_leave_lobby(ws: WebSocket, msg: dict):
+    await leave_room(ws)
+    remove_from_lobby(ws)
+    await send_lobby_status(ws)
+    await broadcast_lobbies()
+
+
+@route("create_lobby", schema={"owner?": str, "netcode?": str})
+async def handle_create_lobby(ws: WebSocket, msg: dict):
+    # Already in a lobby → reject
+    if clients[ws]["lobby"] is not None:
+        await send(ws, {
+            "type": "error",
+            "message": "already_in_lobby"
+        })
+        return
+
+    netcode = msg.get("netcode", ROOM_NETCODE_DEFAULT)
+    if netcode not in ROOM_NETCODES:
+        await send(ws, {
+            "type": "error",
+            "message": "invalid_netcode"
+        })
+        return
+
+    create_lobby(ws, msg.get("owner", "Anon"), netcode)
+
+    await send_lobby_status(ws)
+    await broadcast_lobbies()
+
+
+@route("join_lobby", schema={"id": str})
+async def handle_join_lobby(ws: WebSocket, msg: dict):
+    # Already in a lobby → reject
+    if clients[ws]["lobby"] is not None:
+        await send(ws, {
+            "type": "error",
+            "message": "already_in_lobby"
+        })
+        return
+
+    lobby_id = msg["id"]
+    lobby = lobbies.get(lobby_id)
+
+    if not lobby:
+        return
+
+    if len(lobby["players"]) >= lobby["max_players"]:
+        return
+
+    await join_lobby(ws, lobby)
+
+
+@route("quick_match", schema={"owner?": str, "netcode?": str})
+async def handle_quick_match(ws: WebSocket, msg: dict):
+    # Already in a lobby → reject
+    if clients[ws]["lobby"] is not None:
+        await send(ws, {
+            "type": "error",
+            "message": "already_in_lobby"
+        })
+        return
+
+    # Oldest waiting lobby, else host a new one and wait at the back of the queue
+    lobby_id = next(iter(open_lobbies), None)
+    if lobby_id is not None:
+        await join_lobby(ws, lobbies[lobby_id])
+        return
+
+    # (the netcode preference only applies to a lobby we host, joining takes theirs)
+    netcode = msg.get("netcode", ROOM_NETCODE_DEFAULT)
+    create_lobby(ws, msg.get("owner", "Anon"), netcode if netcode in ROOM_NETCODES else ROOM_NETCODE_DEFAULT)
+    await send_lobby_status(ws)
+    await broadcast_lobbies()
+
+
+# Packets carry the newest few inputs: {"seq": newest seq, "dirs": [..., newest]}
+# (under rollback the seq is the tick the input is for)
+@route("input", schema={"seq": int, "dirs": list}, rate_limited=False)
+async def handle_input(ws: WebSocket, msg: dict):
+    room = rooms.get(clients[ws]["lobby"])
+    if not room or ws not in room["players"]:
+        return
+
+    slot = room["players"].index(ws)
+    last_seq = room["input_seq"][slot]
+    dirs = msg["dirs"][-ROLLBACK_MAX_INPUT_LEAD:]
+    if not all(type(direction) is int for direction in dirs):
+        return
+    first = msg["seq"] - len(dirs) + 1
+
+    # dedupe: only inputs newer than anything already seen from this player
+    fresh = [
+        (first + i, max(-1, min(1, direction)))
+        for i, direction in enumerate(dirs)
+        if first + i > last_seq
+    ]
+    room["input_duplicates"] += len(dirs) - len(fresh)
+
+    if room["netcode"] == "rollback":
+        # only ticks the sim can still use; filtered before input_seq moves, or one far-future
+        # seq would mark every real input after it as a duplicate
+        sim: PongSimulation = room["sim"]
+        fresh = [(tick, direction) for tick, direction in fresh if sim.tick < tick <= sim.tick + ROLLBACK_MAX_INPUT_LEAD]
+
+    if not fresh:
+        return
+    room["input_seq"][slot] = fresh[-1][0]
+
+    if room["netcode"] != "rollback":
+        room["inputs"][slot] = fresh[-1][1]
+        return
+
+    # Rollback: relay the new ones straight to the other player
+    room["pending_inputs"][slot].update(fresh)
+    frame = json.dumps({"type": "peer_input", "seq": fresh[-1][0], "dirs": [direction for _, direction in fresh]})
+    for other in room["players"]:
+        if other is not ws:
+            await send_raw(other, frame)
+
+
+@route("spectate", schema={"id": str})
+async def handle_spectate(ws: WebSocket, msg: dict):
+    room = rooms.get(msg["id"])
+    if not room or clients[ws]["lobby"] is not None:
+        await send(ws, {
+            "type": "error",
+            "message": "cannot_spectate"
+        })
+        return
+
+    await leave_room(ws)
+    room["spectators"].add(ws)
+    clients[ws]["spectating"] = room["id"]
+    bump_lobby_version()
+
+    await send(ws, {
+        "type": "spectate_start",
+        "id": room["id"],
+        "name": room["name"],
+        "delay_s": SPECTATOR_DELAY_S,
+    })
+
+
+@route("leave_spectate")
+async def handle_leave_spectate(ws: WebSocket, msg: dict):
+    await leave_room(ws)
+
+
 # -----------------------------
 # Routes
 # -----------------------------
@@ -100,14 +749,92 @@ def root():
     return {"status": "ok"}
 
 
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match is a comma separated list of (maybe weak, W/"...") tags, or *."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@app.get("/lobbies")
+async def get_lobbies(request: Request):
+    """
+    Lobby snapshot for clients that don't hold a websocket open (e.g. while the
+    server is cold booting). Serialized once per lobby_version, and 304'd when
+    the client's If-None-Match still matches. Async so it reads the lobbies on the
+    event loop, never halfway through one of its updates.
+    """
+    global lobby_snapshot
+
+    if lobby_snapshot is None or lobby_snapshot[0] != lobby_version:
+        listing = [lobby_entry(lobbies[lid]) for _, lid in lobby_index_all]
+
+        body = json.dumps({
+            "version": lobby_version,
+            "lobbies": len(lobbies),
+            "open": len(open_lobbies),
+            "players": sum(item["players"] for item in listing),
+            "list": listing,
+        }).encode()
+        lobby_snapshot = (lobby_version, body, f'"{BOOT_ID}-{lobby_version}"')
+
+    _, body, etag = lobby_snapshot
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "routes": {
+            msg_type: route.stats()
+            # slowest handlers first
+            for msg_type, route in sorted(HANDLERS.items(), key=lambda kv: kv[1].total_ms, reverse=True)
+        },
+        "unknown_messages": unknown_message_count,
+        "rooms": {
+            room_id: {
+                "tick": room["sim"].tick,
+                "spectators": len(room["spectators"]),
+                "netcode": room["netcode"],
+                "input_duplicates": room["input_duplicates"],
+            }
+            for room_id, room in rooms.items()
+        },
+        "net": net_stats.snapshot(),
+    }
+
+
+async def dump_net_stats():
+    # snapshot on the loop (cheap), append to disk on a thread
+    while True:
+        await asyncio.sleep(NETSTATS_DUMP_S)
+        await asyncio.to_thread(net_stats.dump, NETSTATS_PATH, net_stats.snapshot())
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
+    global net_stats_task
+
     await ws.accept()
+    # started with the first connection, there has to be a running loop
+    if NETSTATS_PATH and net_stats_task is None:
+        net_stats_task = asyncio.create_task(dump_net_stats())
+
     clients[ws] = {
         "lobby": None,
         # rl = Rate limit
         "rlLobbyRequestTime": time.time(),
         "rlLobbyRequestCount": 0,
+        # last list_lobbies query, used for every lobby_list pushed to this client
+        "query": {},
+        # id of the room this client is watching
+        "spectating": None,
     }
 
     try:
@@ -116,117 +843,26 @@ async def websocket_endpoint(ws: WebSocket):
 
             # Ignore non-JSON garbage
             if not raw or raw[0] != "{":
+                net_stats.record("in", "other", len(raw))
                 continue
 
-            msg = json.loads(raw)
-            msg_type = msg.get("type")
-
-            now = time.time()
+            try:
+                msg = json.loads(raw)
+            except json.JSONDecodeError:
+                net_stats.record("in", "other", len(raw))
+                continue
 
-            # -- Clear slate every 30 seconds
-            if now - clients[ws]["rlLobbyRequestTime"] >= LOBBY_RATE_LIMIT_REFRESH_S:
-                clients[ws]["rlLobbyRequestTime"] = now
-                clients[ws]["rlLobbyRequestCount"] = 0
+            # only known types get their own counter, clients pick the rest
+            msg_type = msg.get("type")
+            net_stats.record("in", msg_type if isinstance(msg_type, str) and msg_type in HANDLERS else "unknown", len(raw))
 
-            # -- Reject user if too many lobby requests
-            if clients[ws]["rlLobbyRequestCount"] >= LOBBY_RATE_LIMIT_CAP:
-                await reject_request()
-                continue
-            else:
-                clients[ws]["rlLobbyRequestCount"] += 1
-
-            
-
-            print(clients[ws]["rlLobbyRequestCount"],clients[ws]["rlLobbyRequestCount"])
-
-            # -----------------------------
-            # LIST LOBBIES
-            # -----------------------------
-            if msg_type == "list_lobbies":
-                await broadcast_lobbies()
-                await send_lobby_status(ws)
-
-            # -----------------------------
-            # LEAVE LOBBY
-            # -----------------------------
-            elif msg_type == "leave_lobby":
-                remove_from_lobby(ws)
-                await send_lobby_status(ws)
-                await broadcast_lobbies()
-
-            # -----------------------------
-            # CREATE LOBBY
-            # -----------------------------
-            elif msg_type == "create_lobby":
-                # Already in a lobby → reject
-                if clients[ws]["lobby"] is not None:
-                    await send(ws, {
-                        "type": "error",
-                        "message": "already_in_lobby"
-                    })
-                    continue
-
-                lobby_id = str(uuid.uuid4())[:8]
-
-                words = [
-                    "PONG","BALL","WHAM","SPIN","GAME","PLAY","MISS","BEEP",
-                    "DING","BUMP","WALL","NETS","EDGE","ZONE","DUEL","COOP",
-                    "MODE","FAST","SLOW","HOST","JOIN"
-                ]
-                name = f"{random.choice(words)}-{random.randint(1000,9999)}"
-
-                lobbies[lobby_id] = {
-                    "id": lobby_id,
-                    "owner": msg.get("owner", "Anon"),
-                    "name": name,
-                    "players": [ws],
-                    "max_players": 2,
-                }
-
-                clients[ws]["lobby"] = lobby_id
-
-                await send_lobby_status(ws)
-                await broadcast_lobbies()
-
-            # -----------------------------
-            # JOIN LOBBY
-            # -----------------------------
-            elif msg_type == "join_lobby":
-                # Already in a lobby → reject
-                if clients[ws]["lobby"] is not None:
-                    await send(ws, {
-                        "type": "error",
-                        "message": "already_in_lobby"
-                    })
-                    continue
-
-                lobby_id = msg.get("id")
-                lobby = lobbies.get(lobby_id)
-
-                if not lobby:
-                    continue
-
-                if len(lobby["players"]) >= lobby["max_players"]:
-                    continue
-
-                lobby["players"].append(ws)
-                clients[ws]["lobby"] = lobby_id
-
-                await send_lobby_status(ws)
-                await broadcast_lobbies()
-
-                # Auto-start when full
-                if len(lobby["players"]) == lobby["max_players"]:
-                    for player in lobby["players"]:
-                        await send(player, {"type": "start_game"})
-
-            else:
-                pass
+            await dispatch(ws, msg)
 
     except WebSocketDisconnect:
         pass
 
     finally:
+        await leave_room(ws)
         remove_from_lobby(ws)
         clients.pop(ws, None)
         await broadcast_lobbies()